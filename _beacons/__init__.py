@@ -0,0 +1 @@
+"""Beacons Directory."""
@@ -0,0 +1,248 @@
+"""SONiC LLDP beacon.
+
+It keeps the LLDP neighbors of the device in memory, updated by a long-running
+``lldpctl -f json watch``, and fires an event for each change:
+
+- ``salt/beacon/<minion_id>/sonic_lldp/added``
+- ``salt/beacon/<minion_id>/sonic_lldp/removed``
+- ``salt/beacon/<minion_id>/sonic_lldp/updated``
+
+The neighbors are also written in the minion cache directory, so that ``sonic.lldp`` can answer
+without running lldpctl as long as the beacon is running.
+
+Configuration example:
+
+.. code-block:: yaml
+
+    beacons:
+      sonic_lldp:
+        - interval: 10
+"""
+
+import json
+import logging
+import os
+import subprocess
+
+__virtualname__ = "sonic_lldp"
+
+log = logging.getLogger(__name__)
+
+# must be kept in sync with the execution module
+LLDP_CACHE_FILENAME = "sonic_lldp_neighbors.json"
+WATCH_EVENTS = {"lldp-added": "added", "lldp-deleted": "removed", "lldp-updated": "updated"}
+
+
+def __virtual__():
+    return __grains__.get("nos") == "sonic"
+
+
+def validate(config):
+    """Validate the beacon configuration."""
+    if not isinstance(config, list):
+        return False, "Configuration for sonic_lldp beacon must be a list."
+
+    return True, "Valid beacon configuration"
+
+
+def _get_cache_file():
+    return os.path.join(__opts__["cachedir"], LLDP_CACHE_FILENAME)
+
+
+def _iter_neighbors(lldp_output):
+    """Iterate over (tag, interface, detail) of a lldpctl JSON output or watch event.
+
+    A single interface is a dict, several interfaces are a list of dicts.
+    """
+    for tag, content in lldp_output.items():
+        entries = (content or {}).get("interface", [])
+        if not isinstance(entries, list):
+            entries = [entries]
+
+        for entry in entries:
+            for interface, detail in entry.items():
+                yield tag, interface, detail
+
+
+def _neighbor_id(detail):
+    """Identify a neighbor of an interface by its chassis and port IDs."""
+    chassis = detail.get("chassis", {})
+    if "id" not in chassis:
+        # if the server is configured values are in chassis[name]
+        chassis = next(iter(chassis.values()), {})
+
+    return chassis.get("id", {}).get("value"), detail.get("port", {}).get("id", {}).get("value")
+
+
+def _read_neighbors():
+    """Get all the current neighbors, per interface."""
+    res = subprocess.run(["lldpctl", "-f", "json"], stdout=subprocess.PIPE, check=True)
+
+    neighbors = {}
+    for _, interface, detail in _iter_neighbors(json.loads(res.stdout)):
+        neighbors.setdefault(interface, []).append(detail)
+
+    return neighbors
+
+
+def _start_watch():
+    watcher = subprocess.Popen(  # pylint: disable=consider-using-with
+        ["lldpctl", "-f", "json", "watch"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    # only read what is available at each beacon call
+    os.set_blocking(watcher.stdout.fileno(), False)
+
+    return watcher
+
+
+def _read_watch(watcher):
+    """Read the pending output of the watcher without blocking."""
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(watcher.stdout.fileno(), 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+
+    return b"".join(chunks).decode()
+
+
+def _decode_events(buffer):
+    """Decode the complete JSON objects of the buffer, return them and what remains."""
+    decoder = json.JSONDecoder()
+    events = []
+    pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            break
+        try:
+            event, pos = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            # partial object, the rest will come with next reads
+            break
+        events.append(event)
+
+    return events, buffer[pos:]
+
+
+def _apply_event(neighbors, change, interface, detail):
+    """Apply a watch event on the neighbors, return True if they changed."""
+    details = neighbors.get(interface, [])
+    neighbor_id = _neighbor_id(detail)
+    kept = [known for known in details if _neighbor_id(known) != neighbor_id]
+
+    if change != "removed":
+        kept.append(detail)
+    elif len(kept) == len(details):
+        return False
+
+    if kept:
+        neighbors[interface] = kept
+    else:
+        neighbors.pop(interface, None)
+
+    return True
+
+
+def _diff_neighbors(old, new):
+    """Get the events between two states of the neighbors."""
+    events = []
+
+    for interface in sorted(set(old) | set(new)):
+        old_details = {_neighbor_id(detail): detail for detail in old.get(interface, [])}
+        new_details = {_neighbor_id(detail): detail for detail in new.get(interface, [])}
+
+        for neighbor_id, detail in new_details.items():
+            if neighbor_id not in old_details:
+                events.append(_event("added", interface, detail))
+            elif old_details[neighbor_id] != detail:
+                events.append(_event("updated", interface, detail))
+
+        for neighbor_id, detail in old_details.items():
+            if neighbor_id not in new_details:
+                events.append(_event("removed", interface, detail))
+
+    return events
+
+
+def _event(change, interface, detail):
+    return {"tag": change, "interface": interface, "neighbor": detail}
+
+
+def _save_cache(neighbors):
+    """Write the neighbors like a lldpctl JSON output ({"interface": [{name: detail}, ...]})."""
+    cache_file = _get_cache_file()
+    tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+    entries = [
+        {interface: detail} for interface in sorted(neighbors) for detail in neighbors[interface]
+    ]
+
+    with open(tmp_file, "w", encoding="utf-8") as fd:
+        json.dump({"interface": entries}, fd, separators=(",", ":"))
+    os.replace(tmp_file, cache_file)
+
+
+def _touch_cache():
+    """Show the cache is still maintained."""
+    try:
+        os.utime(_get_cache_file())
+    except OSError:
+        return False
+
+    return True
+
+
+def beacon(config):  # pylint: disable=unused-argument
+    """Fire an event for each LLDP neighbor added, removed or updated.
+
+    The watcher is started at first call and restarted if it stops; the neighbors are read
+    again at each (re)start, changes missed meanwhile are fired at restart.
+    """
+    watcher = __context__.get("sonic_lldp.watcher")
+    neighbors = __context__.get("sonic_lldp.neighbors")
+    events = []
+
+    if watcher is None or watcher.poll() is not None:
+        # watch before reading the neighbors to not miss any change in between
+        try:
+            watcher = _start_watch()
+        except OSError as exc:
+            log.warning("Unable to watch LLDP neighbors: %s", exc)
+            return []
+
+        try:
+            current = _read_neighbors()
+        except (OSError, subprocess.CalledProcessError, ValueError) as exc:
+            log.warning("Unable to read LLDP neighbors: %s", exc)
+            watcher.kill()
+            watcher.wait()
+            return []
+
+        if neighbors is not None:
+            events = _diff_neighbors(neighbors, current)
+        neighbors = current
+        __context__["sonic_lldp.watcher"] = watcher
+        __context__["sonic_lldp.neighbors"] = neighbors
+        __context__["sonic_lldp.buffer"] = ""
+        _save_cache(neighbors)
+        return events
+
+    watch_events, __context__["sonic_lldp.buffer"] = _decode_events(
+        __context__["sonic_lldp.buffer"] + _read_watch(watcher)
+    )
+    for watch_event in watch_events:
+        for tag, interface, detail in _iter_neighbors(watch_event):
+            change = WATCH_EVENTS.get(tag)
+            if change and _apply_event(neighbors, change, interface, detail):
+                events.append(_event(change, interface, detail))
+
+    if events or not _touch_cache():
+        _save_cache(neighbors)
+
+    return events
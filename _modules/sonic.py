@@ -8,9 +8,15 @@ configuration, stopping the service during few seconds.
 # pylint: disable=C0302
 
 import difflib
+import importlib.machinery
 import json
 import logging
+import os
 import re
+import shlex
+import subprocess
+import time
+import types
 from collections import defaultdict
 from datetime import datetime
 from ipaddress import IPv4Network, ip_address
@@ -25,6 +31,55 @@ CONFIGDB_FILE = "/etc/sonic/config_db.json"
 FRR_FILE = "/etc/sonic/frr/frr.conf"
 SNMP_FILE = "/etc/sonic/snmp.yml"
 SONIC_DIR = "/etc/sonic/"
+INTF_INFORMATION_SCRIPT = "/opt/salt/scripts/criteo_intf_information"
+COUNTERS_SNAPSHOT_FILENAME = "sonic_interface_counters.json"
+# written by the sonic_lldp beacon, used while the beacon keeps it up to date
+LLDP_CACHE_FILENAME = "sonic_lldp_neighbors.json"
+LLDP_CACHE_MAX_AGE = 300
+FDBSHOW_COMMAND = "/usr/bin/python /opt/salt/scripts/criteo_fdbshow -n"
+# criteo_fdbshow filters entries per MAC (-a) since this version
+FDBSHOW_ADDRESS_FILTER_VERSION = 202205
+MAC_ADDRESS_RE = re.compile(r"^([0-9A-F]{2}:){5}[0-9A-F]{2}$")
+FDB_SNAPSHOT_FILENAME = "sonic_fdb_snapshot.json"
+# packed Vlan/MAC, port index, static, moves, last move timestamp
+FDB_SNAPSHOT_FIELDS = 5
+BGP_FINGERPRINTS_FILENAME = "sonic_bgp_fingerprints.json"
+BGP_FINGERPRINTS_MAX_AGE = 86400
+
+# counters kept in the snapshot to compute rates, in the order they are stored
+SNAPSHOT_COUNTERS = [
+    "RX_OCTETS",
+    "TX_OCTETS",
+    "RX_OK",
+    "TX_OK",
+    "RX_ERR",
+    "RX_DRP",
+    "TX_ERR",
+    "TX_DRP",
+]
+# rate name: (counter, multiplier)
+COUNTER_RATES = {
+    "rx_bps": ("RX_OCTETS", 8),
+    "tx_bps": ("TX_OCTETS", 8),
+    "rx_pps": ("RX_OK", 1),
+    "tx_pps": ("TX_OK", 1),
+    "rx_errors_ps": ("RX_ERR", 1),
+    "rx_discards_ps": ("RX_DRP", 1),
+    "tx_errors_ps": ("TX_ERR", 1),
+    "tx_discards_ps": ("TX_DRP", 1),
+}
+COUNTER_MAX = 2**64
+
+# "ip -o addr show" families
+IP_FAMILIES = {"inet": "ipv4", "inet6": "ipv6"}
+# netmask (as given by network.interfaces) to prefix length
+NETMASK_PREFIXLEN = {
+    str(IPv4Network("0.0.0.0/{}".format(prefixlen)).netmask): prefixlen for prefixlen in range(33)
+}
+
+# collectors loaded from criteo_intf_information and kept between calls to reuse their redis
+# connections, per class name. False if the script cannot be loaded by the minion python
+_COLLECTORS = {}
 
 
 def __virtual__():
@@ -39,6 +94,60 @@ def _utils_call(command, *args, **kwargs):
     return __utils__[command](*args, **kwargs)
 
 
+def _read_cache_file(filename):
+    """Read a JSON file of the minion cachedir, None if it is missing or corrupted."""
+    try:
+        with open(os.path.join(__opts__["cachedir"], filename), encoding="utf-8") as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache_file(filename, data):
+    """Write a JSON file of the minion cachedir atomically."""
+    cache_file = os.path.join(__opts__["cachedir"], filename)
+    tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+    with open(tmp_file, "w", encoding="utf-8") as fd:
+        json.dump(data, fd, separators=(",", ":"))
+    os.replace(tmp_file, cache_file)
+
+
+def _load_script(path):
+    """Load a helper script (without .py extension) as a python module."""
+    loader = importlib.machinery.SourceFileLoader(os.path.basename(path), path)
+    module = types.ModuleType(loader.name)
+    module.__file__ = path
+    loader.exec_module(module)
+    return module
+
+
+def _run_ndjson(command):
+    """Run a command printing one JSON object per line, and yield objects while it runs.
+
+    Unlike cmd.run, the whole output is never kept in memory.
+    """
+    with subprocess.Popen(
+        shlex.split(command), stdout=subprocess.PIPE, universal_newlines=True
+    ) as proc:
+        for line in proc.stdout:
+            if not line.strip():
+                continue
+
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                raise CommandExecutionError(
+                    "Invalid output of {}: {}".format(command, line.strip())
+                ) from exc
+            if isinstance(data, dict) and list(data) == ["error"]:
+                raise CommandExecutionError(data["error"])
+
+            yield data
+
+    if proc.returncode != 0:
+        raise CommandExecutionError("Failed to run {}".format(command))
+
+
 def _diff(config_a, config_b, name_a="before", name_b="after"):
     config_a_list = config_a.splitlines(keepends=True)
     config_b_list = config_b.splitlines(keepends=True)
@@ -52,39 +161,189 @@ def _diff(config_a, config_b, name_a="before", name_b="after"):
 ##
 
 
-def get_interfaces(interface=""):
+def _to_list(value):
+    """Convert a comma separated string (as given from the CLI) to a list."""
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    return list(value)
+
+
+def _get_collector(class_name):
+    """Get an in-process collector of criteo_intf_information, None if it is unavailable.
+
+    Salt runs each job in a new process by default, so connections are kept between calls of
+    a same job, and between jobs only if the minion runs them in threads (multiprocessing: False).
+    """
+    if class_name not in _COLLECTORS:
+        try:
+            script = _load_script(INTF_INFORMATION_SCRIPT)
+            _COLLECTORS[class_name] = getattr(script, class_name)()
+        except Exception as exc:  # pylint: disable=broad-except
+            # the script can rely on an interpreter or libraries the minion does not have
+            log.debug("Unable to load %s in-process: %s", INTF_INFORMATION_SCRIPT, exc)
+            _COLLECTORS[class_name] = False
+
+    return _COLLECTORS[class_name] or None
+
+
+def _reset_collector(class_name):
+    _COLLECTORS.pop(class_name, None)
+
+
+def _get_interfaces_information(interfaces, fields):
+    command = "{} -n".format(INTF_INFORMATION_SCRIPT)
+    if fields:
+        command += " -f {}".format(",".join(fields))
+    if interfaces:
+        command += " {}".format(" ".join(interfaces))
+
+    return _run_ndjson(command)
+
+
+def get_interfaces(interface="", interfaces=None, fields=None):
     """Get interface(s) details.
 
     Including common info (status, description...) and both transceiver and optical levels.
 
+    Only the data needed by the requested fields are read on the device, for instance optical
+    levels are not read at all if neither rx_power nor tx_power is requested.
+
+    The collector of criteo_intf_information is loaded in the minion process when possible,
+    otherwise the script is run and its output is read one interface at a time.
+
     :param interface: interface name
-    """
-    # enforce empty string if interface is None
-    if not interface:
-        interface = ""
+    :param interfaces: list of interface names, default: all interfaces if interface is not set
+    :param fields: list of fields to get, default: all fields. Supported fields are alias,
+        description, admin_status, oper_status, lanes, speed, mtu, optic_type, optic_model,
+        optic_manufacturer, rx_power and tx_power (rx_power/tx_power get the power of each lane)
 
-    res = __salt__["cmd.run"]("/opt/salt/scripts/criteo_intf_information {}".format(interface))
+    CLI Example:
 
-    if __context__["retcode"] != 0:
-        raise CommandExecutionError("Failed to run criteo_intf_information script")
+    .. code-block:: bash
 
-    return json.loads(res)
+        salt "sonic.tor" sonic.get_interfaces interfaces=Ethernet0,Ethernet4 fields=speed,mtu
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "Ethernet0": {"speed": "100G", "mtu": "9100"},
+            "Ethernet4": {"speed": "100G", "mtu": "9100"},
+        }
+    """
+    interfaces = _to_list(interface) + _to_list(interfaces)
+    fields = _to_list(fields)
+
+    collector = _get_collector("IntfInformation")
+    if collector:
+        try:
+            return collector.get_intf_information(interfaces, fields) or {}
+        except ValueError as exc:
+            raise CommandExecutionError(str(exc)) from exc
+        except Exception as exc:  # pylint: disable=broad-except
+            # connections can be lost (redis restart...), reconnect on next call
+            log.warning("In-process interface collector failed, running the script: %s", exc)
+            _reset_collector("IntfInformation")
+
+    result = {}
+    for interface_info in _get_interfaces_information(interfaces, fields):
+        result.update(interface_info)
+
+    return result
 
 
 def _get_interfaces_brief():
     return __salt__["network.interfaces"]()
 
 
-def get_ip_addresses(interface):
+def _get_ip_addresses_dump(interface=None):
+    """Dump the addresses of all links, or of a single link, with one netlink request.
+
+    Return None if ip is not usable, an empty string if the link does not exist.
+    """
+    command = ["ip", "-o", "addr", "show"]
+    if interface:
+        command += ["dev", interface]
+
+    res = __salt__["cmd.run_all"](command, python_shell=False, ignore_retcode=True)
+    if res["retcode"] != 0:
+        if interface and "does not exist" in res["stderr"]:
+            return ""
+        return None
+
+    return res["stdout"]
+
+
+def _parse_ip_addresses(output):
+    """Parse "ip -o addr show" output, one address per line.
+
+    Example of line:
+    2: Ethernet0    inet 192.0.2.0/31 scope global Ethernet0
+    """
+    addresses = defaultdict(lambda: defaultdict(list))
+
+    for line in output.splitlines():
+        tokens = line.split()
+        if len(tokens) < 4 or tokens[2] not in IP_FAMILIES:
+            continue
+        addresses[tokens[1]][IP_FAMILIES[tokens[2]]].append(tokens[3])
+
+    return {interface: dict(family) for interface, family in addresses.items()}
+
+
+def _convert_interfaces_brief(interfaces):
+    """Get addresses from network.interfaces output."""
+    addresses = {}
+
+    for interface, details in interfaces.items():
+        ipv4 = [
+            "{}/{}".format(addr["address"], NETMASK_PREFIXLEN[addr["netmask"]])
+            for addr in details.get("inet", [])
+        ]
+        ipv6 = [
+            "{}/{}".format(addr["address"], addr["prefixlen"]) for addr in details.get("inet6", [])
+        ]
+        addresses[interface] = {
+            family: cidrs for family, cidrs in (("ipv4", ipv4), ("ipv6", ipv6)) if cidrs
+        }
+
+    return addresses
+
+
+def _get_ip_addresses(interface=None):
+    output = _get_ip_addresses_dump(interface)
+    if output is not None:
+        return _parse_ip_addresses(output)
+
+    # ip unusable, use the salt network module (several commands)
+    interfaces = _get_interfaces_brief() or {}
+    if interface:
+        interfaces = {interface: interfaces[interface]} if interface in interfaces else {}
+
+    return _convert_interfaces_brief(interfaces)
+
+
+def get_ip_addresses(interface="", interfaces=None):
     """Get IPv4 and IPv6 addresses of a SONiC device (or any other Linux based device).
 
-    :param interface: interface name we want (ex: Ethernet0)
+    Addresses are read with a single netlink dump, restricted to the link when a single
+    interface is requested.
+
+    :param interface: interface name we want (ex: Ethernet0), addresses are returned directly
+    :param interfaces: list of interface names, addresses are returned per interface.
+        Default: all interfaces if interface is not set
 
     CLI Example:
 
     .. code-block:: bash
 
         salt "sonic.tor" sonic.get_ip_addresses Ethernet0
+        salt "sonic.tor" sonic.get_ip_addresses interfaces=Ethernet0,Ethernet4
 
     Output example:
 
@@ -94,24 +353,23 @@ def get_ip_addresses(interface):
             "ipv4": ["192.0.2.0/31"],
             "ipv6": ["2001:db8::/127", "2001:db8::/64"],
         }
-    """
-    interfaces = _get_interfaces_brief()
 
-    if not interfaces or interface not in interfaces:
-        return {}
-
-    addresses = defaultdict(list)
+        # per interface
+        {
+            "Ethernet0": {"ipv4": ["192.0.2.0/31"]},
+            "Ethernet4": {"ipv4": ["192.0.2.2/31"]},
+        }
+    """
+    if interface and not interfaces:
+        return _get_ip_addresses(interface).get(interface, {})
 
-    for addr in interfaces[interface].get("inet", {}):
-        prefix_len = IPv4Network("0.0.0.0/{}".format(addr["netmask"])).prefixlen
-        cidr = "{}/{}".format(addr["address"], prefix_len)
-        addresses["ipv4"].append(cidr)
+    interfaces = _to_list(interface) + _to_list(interfaces)
+    addresses = _get_ip_addresses(interfaces[0] if len(interfaces) == 1 else None)
 
-    for addr in interfaces[interface].get("inet6", {}):
-        cidr = "{}/{}".format(addr["address"], addr["prefixlen"])
-        addresses["ipv6"].append(cidr)
+    if not interfaces:
+        return addresses
 
-    return dict(addresses)
+    return {name: addresses[name] for name in interfaces if name in addresses}
 
 
 def _convert_interface_counters_napalm_fmt(counters):
@@ -135,13 +393,106 @@ def _convert_interface_counters_napalm_fmt(counters):
     return {"out": data}
 
 
-def get_interface_counters(interface="", napalm_output=False):
+def _parse_counter(value):
+    """Convert a counter to int, None if unavailable (ex: N/A)."""
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _counter_delta(previous, current):
+    """Get the increase of a counter, handling counter wraps and clears."""
+    if current >= previous:
+        return current - previous
+
+    # a 64 bits counter close to its maximum value has wrapped
+    if previous - current > COUNTER_MAX // 2:
+        return current + COUNTER_MAX - previous
+
+    # the counter has been cleared, it has been counting from 0 since
+    return current
+
+
+def _load_counters_snapshot():
+    """Load the previous counters.
+
+    Per interface: [timestamp, counters in SNAPSHOT_COUNTERS order].
+    """
+    return _read_cache_file(COUNTERS_SNAPSHOT_FILENAME) or {}
+
+
+def _compute_interface_counters_rates(counters, now):
+    """Compute rates per second since the previous snapshot, and store the new snapshot.
+
+    Rates are None on the first call for an interface, or if the counter is unsupported.
+    """
+    snapshot = _load_counters_snapshot()
+    rates = {}
+
+    for interface, stats in counters.items():
+        current = [_parse_counter(stats.get(counter, "N/A")) for counter in SNAPSHOT_COUNTERS]
+        previous = snapshot.get(interface)
+        snapshot[interface] = [now] + current
+
+        interval = now - previous[0] if previous else None
+        rates[interface] = {"interval": interval}
+
+        for rate, (counter, multiplier) in COUNTER_RATES.items():
+            index = SNAPSHOT_COUNTERS.index(counter)
+            value = current[index]
+            previous_value = previous[index + 1] if previous else None
+
+            if not interval or interval <= 0 or value is None or previous_value is None:
+                rates[interface][rate] = None
+                continue
+
+            rates[interface][rate] = _counter_delta(previous_value, value) * multiplier / interval
+
+    _write_cache_file(COUNTERS_SNAPSHOT_FILENAME, snapshot)
+
+    return rates
+
+
+def _get_port_counters(interfaces):
+    collector = _get_collector("PortCounters")
+    if collector:
+        try:
+            return collector.get_counters(interfaces)
+        except Exception as exc:  # pylint: disable=broad-except
+            # connections can be lost (redis restart...), reconnect on next call
+            log.warning("In-process counters collector failed, running the script: %s", exc)
+            _reset_collector("PortCounters")
+
+    command = "{} -n -c".format(INTF_INFORMATION_SCRIPT)
+    if interfaces:
+        command += " {}".format(" ".join(interfaces))
+
+    counters = {}
+    for port_counters in _run_ndjson(command):
+        counters.update(port_counters)
+
+    return counters
+
+
+def get_interface_counters(interface="", napalm_output=False, rates=False):
     """Get interface counters.
 
+    Counters are read from COUNTERS_DB, only for the requested interface if any, and exposed
+    like "portstat -j", plus RX_OCTETS and TX_OCTETS.
+
+    Unlike "portstat -j", counters are the raw values since the start of the switch: the
+    snapshots taken by "sonic-clear counters" are not subtracted. RX_BPS, RX_UTIL, TX_BPS and
+    TX_UTIL come from the RATES table, they are "N/A" on 201911 which does not have it (use
+    rates=True instead).
+
     Values set to None means unsupported.
 
     :param interface: interface name we want (ex: Ethernet0)
     :param napalm_output: expose info in the same data structure than napalm (to ease integration)
+    :param rates: get rates per second since the previous call instead of counters, counters
+        are kept in a snapshot on the minion. Rates are None on the first call for an interface.
+        Counter wraps and clears are handled.
 
     .. code-block:: bash
 
@@ -171,17 +522,43 @@ def get_interface_counters(interface="", napalm_output=False):
                 }
             }
         }
+
+    .. code-block:: bash
+
+        salt "sonic.tor" sonic.get_interface_counters Ethernet0 rates=True
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "sonic.tor": {
+                "Ethernet0": {
+                    "interval": 60.2,
+                    "rx_bps": 15201548.5,
+                    "tx_bps": 13809217.1,
+                    "rx_pps": 1520.3,
+                    "tx_pps": 1380.9,
+                    "rx_errors_ps": 0.0,
+                    "rx_discards_ps": 0.0,
+                    "tx_errors_ps": 0.0,
+                    "tx_discards_ps": 0.0,
+                }
+            }
+        }
     """
     # enforce empty string when interface is None
     if not interface:
         interface = ""
 
-    res = _salt_call("cmd.run", "portstat -j")
-    data = json.loads(res)
+    data = _get_port_counters(_to_list(interface))
 
     if interface:
         data = {interface: data.get(interface, {})}
 
+    if rates:
+        return _compute_interface_counters_rates(data, time.time())
+
     if napalm_output:
         return _convert_interface_counters_napalm_fmt(data)
 
@@ -206,8 +583,9 @@ def _convert_lldp_napalm_fmt(lldp_info):
     interfaces = {}
     lldp_info = _utils_call("data_mgmt.normalize_plural", lldp_info)
 
+    # lldp_info is left untouched so that it can be reused
     for interface in lldp_info:
-        name, detail = interface.popitem()
+        name, detail = next(iter(interface.items()))
 
         if "id" in detail["chassis"]:
             # if the server is not configured values are in chassis
@@ -215,7 +593,7 @@ def _convert_lldp_napalm_fmt(lldp_info):
             remote_name = ""
         else:
             # if the server is configured values are in chassis[name]
-            remote_name, chassis_info = detail["chassis"].popitem()
+            remote_name, chassis_info = next(iter(detail["chassis"].items()))
 
         enabled_cap = None
         all_cap = None
@@ -245,9 +623,9 @@ def _convert_mac_napalm_fmt(mac_info):
             "interface": mac_info_item["Port"],
             "vlan": mac_info_item["Vlan"],
             "static": bool(mac_info_item["Type"] == "Static"),
-            "active": "N/A",
-            "moves": "N/A",
-            "last_move": "N/A",
+            "active": mac_info_item.get("Active", "N/A"),
+            "moves": mac_info_item.get("Moves", "N/A"),
+            "last_move": mac_info_item.get("LastMove", "N/A"),
         }
         for mac_info_item in mac_info
     ]
@@ -255,14 +633,51 @@ def _convert_mac_napalm_fmt(mac_info):
     return output
 
 
-def _get_lldp(interface):
-    return __salt__["cmd.run"]("lldpctl -f json {}".format(interface))
+def _get_lldp(interfaces):
+    return __salt__["cmd.run"]("lldpctl -f json {}".format(" ".join(interfaces)))
+
+
+def _get_cached_lldp(interfaces):
+    """Get lldp info from the neighbors kept by the sonic_lldp beacon.
+
+    Return None if the cache is not warm (beacon not running), the parsed cache is kept for
+    the rest of the job.
+    """
+    cache_file = os.path.join(__opts__["cachedir"], LLDP_CACHE_FILENAME)
+    try:
+        mtime = os.path.getmtime(cache_file)
+    except OSError:
+        return None
+
+    if time.time() - mtime > LLDP_CACHE_MAX_AGE:
+        return None
+
+    cached = __context__.get("sonic.lldp_cache")
+    if not cached or cached[0] != mtime:
+        try:
+            with open(cache_file, encoding="utf-8") as fd:
+                cached = (mtime, json.load(fd)["interface"])
+        except (OSError, ValueError, KeyError):
+            return None
+        __context__["sonic.lldp_cache"] = cached
+
+    lldp_info = cached[1]
+    if interfaces:
+        lldp_info = [entry for entry in lldp_info if next(iter(entry)) in interfaces]
+
+    # same structure than lldpctl: a dict for a single interface
+    return lldp_info[0] if len(lldp_info) == 1 else lldp_info
 
 
-def lldp(interface="", napalm_output=False):
-    """Get lldp info of one or all interfaces.
+def lldp(interface="", interfaces=None, napalm_output=False):
+    """Get lldp info of one, several or all interfaces.
 
-    :param interface: interface name we want (ex: Ethernet0), default shows info for all interfaces
+    Neighbors are read from the cache of the sonic_lldp beacon when it runs on the minion,
+    otherwise all the requested interfaces are read with a single lldpctl call.
+
+    :param interface: interface name we want (ex: Ethernet0)
+    :param interfaces: list of interface names we want,
+        default shows info for all interfaces if interface is not set either
     :param napalm_output: expose info in the same data structure than napalm (to ease integration)
 
     CLI Example:
@@ -270,6 +685,7 @@ def lldp(interface="", napalm_output=False):
     .. code-block:: bash
 
         salt "sonic.tor" sonic.lldp Ethernet0 napalm_output=True
+        salt "sonic.tor" sonic.lldp interfaces=Ethernet0,Ethernet4
 
     Output example:
 
@@ -292,17 +708,20 @@ def lldp(interface="", napalm_output=False):
             }
         }
     """
-    # enforce empty string when interface is None
-    if not interface:
-        interface = ""
+    interfaces = _to_list(interface) + _to_list(interfaces)
 
-    data = _get_lldp(interface)
-    if not data:
-        return None
+    lldp_info = _get_cached_lldp(interfaces)
+    if lldp_info is None:
+        data = _get_lldp(interfaces)
+        if not data:
+            return None
 
-    try:
-        lldp_info = json.loads(data)["lldp"]["interface"]
-    except KeyError:
+        try:
+            lldp_info = json.loads(data)["lldp"]["interface"]
+        except KeyError:
+            return None
+
+    if not lldp_info:
         return None
 
     if napalm_output:
@@ -311,24 +730,67 @@ def lldp(interface="", napalm_output=False):
     return lldp_info
 
 
+def _get_fdb_entries(interface=None, address=None):
+    criteo_fdbshow_command = FDBSHOW_COMMAND
+    if interface:
+        criteo_fdbshow_command += " -p {}".format(interface)
+    if address:
+        criteo_fdbshow_command += " -a {}".format(address)
+
+    return _run_ndjson(criteo_fdbshow_command)
+
+
+def _fdbshow_filters_address():
+    """Check if criteo_fdbshow of the device can filter entries per MAC."""
+    version = str(__salt__["grains.get"]("sonic_build_version", ""))[:6]
+    return version.isdigit() and int(version) >= FDBSHOW_ADDRESS_FILTER_VERSION
+
+
+def _sort_fdb_entries(entries):
+    """Sort streamed entries per VLAN and number them, like the JSON output of criteo_fdbshow."""
+    entries.sort(key=lambda entry: entry["Vlan"])
+    for index, entry in enumerate(entries, start=1):
+        entry["No."] = index
+
+    return entries
+
+
 def get_mac_from_port(interface=None, napalm_output=False):
     """Get MAC info using criteo_fdbshow.
 
     If the interface is specified, return the MAC table for this specific interface.
     If the interface is not specified, return the full MAC table.
+
+    The table is streamed from criteo_fdbshow, one entry at a time: its whole JSON output is not
+    kept as a string next to the parsed entries. All the entries are still kept in memory, to be
+    sorted per VLAN.
     """
-    criteo_fdbshow_command = "/usr/bin/python /opt/salt/scripts/criteo_fdbshow"
-    if interface:
-        criteo_fdbshow_command += " -p {}".format(interface)
+    macport_info = _sort_fdb_entries(list(_get_fdb_entries(interface)))
 
-    # An old version of criteo_fdbshow outputs JSON by default and does not support
-    # the "-j" option, newer version requires "-j" to output JSON.
-    if "201911" not in __salt__["grains.get"]("sonic_build_version"):
-        criteo_fdbshow_command += " -j"
+    if napalm_output:
+        return _convert_mac_napalm_fmt(macport_info)
 
-    macport_info_output = __salt__["cmd.run"](criteo_fdbshow_command)
+    return macport_info
+
+
+def get_port_from_mac(mac="", napalm_output=False):
+    """Get interface of a MAC using criteo_fdbshow.
+
+    The MAC is filtered by criteo_fdbshow when the version of the device supports it.
+    """
+    mac = mac.upper()
+    if not MAC_ADDRESS_RE.match(mac):
+        return None
 
-    macport_info = json.loads(macport_info_output)
+    if _fdbshow_filters_address():
+        macport_info = list(_get_fdb_entries(address=mac))
+    else:
+        macport_info = [x for x in _get_fdb_entries() if x["MacAddress"] == mac]
+
+    if macport_info == []:
+        return None
+
+    macport_info = _sort_fdb_entries(macport_info)
 
     if napalm_output:
         return _convert_mac_napalm_fmt(macport_info)
@@ -336,28 +798,233 @@ def get_mac_from_port(interface=None, napalm_output=False):
     return macport_info
 
 
-def get_port_from_mac(mac="", napalm_output=False):
-    """Get interface of a MAC using criteo_fdbshow."""
-    criteo_fdbshow_command = "/usr/bin/python /opt/salt/scripts/criteo_fdbshow"
+def get_ports_from_macs(macs, napalm_output=False):
+    """Get interfaces of several MACs using criteo_fdbshow.
 
-    # An old version of criteo_fdbshow outputs JSON by default and does not support
-    # the "-j" option, newer version requires "-j" to output JSON.
-    if "201911" not in __salt__["grains.get"]("sonic_build_version"):
-        criteo_fdbshow_command += " -j"
+    The MAC table is read once, each entry is matched against an index of the wanted MACs.
 
-    full_mactable_output = __salt__["cmd.run"](criteo_fdbshow_command)
+    :param macs: list of MAC addresses
+    :param napalm_output: expose info in the same data structure than napalm (to ease integration)
 
-    full_mactable = json.loads(full_mactable_output)
+    CLI Example:
+
+    .. code-block:: bash
 
-    macport_info = [x for x in full_mactable if x["MacAddress"] == mac]
+        salt "sonic.tor" sonic.get_ports_from_macs macs=00:53:00:01:02:03,00:53:00:01:02:04
 
-    if macport_info == []:
+    Output example (unknown MACs are not returned):
+
+    .. code-block:: python
+
+        {
+            "00:53:00:01:02:03": [
+                {
+                    "No.": 1,
+                    "Vlan": 1001,
+                    "MacAddress": "00:53:00:01:02:03",
+                    "Port": "Ethernet0",
+                    "Type": "Dynamic",
+                }
+            ]
+        }
+    """
+    # normalized MAC -> requested MACs
+    requested = defaultdict(list)
+    for mac in _to_list(macs):
+        requested[mac.upper()].append(mac)
+
+    index = {mac: [] for mac in requested if MAC_ADDRESS_RE.match(mac)}
+    if not index:
+        return {}
+
+    for entry in _get_fdb_entries():
+        matches = index.get(entry["MacAddress"])
+        if matches is not None:
+            matches.append(entry)
+
+    result = {}
+    for mac, entries in index.items():
+        if not entries:
+            continue
+        entries = _sort_fdb_entries(entries)
+        if napalm_output:
+            entries = _convert_mac_napalm_fmt(entries)
+        for requested_mac in requested[mac]:
+            result[requested_mac] = entries
+
+    return result
+
+
+def _get_fdb_counts(interface=None, vlan=None):
+    criteo_fdbshow_command = "{} -c".format(FDBSHOW_COMMAND)
+    if interface:
+        criteo_fdbshow_command += " -p {}".format(interface)
+    if vlan:
+        criteo_fdbshow_command += " -v {}".format(vlan)
+
+    counts = {}
+    for line in _run_ndjson(criteo_fdbshow_command):
+        counts.update(line)
+
+    return counts
+
+
+def get_mac_counts(interface=None, vlan=None):
+    """Count MAC entries in total, per Vlan, per port and per type using criteo_fdbshow.
+
+    Entries are counted by criteo_fdbshow while it reads them, they are never sent.
+
+    :param interface: count only the entries of this interface
+    :param vlan: count only the entries of this Vlan
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt "sonic.tor" sonic.get_mac_counts
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "Total": 3,
+            "Vlan": {1000: 2, 1001: 1},
+            "Port": {"Ethernet0": 2, "Ethernet4": 1},
+            "Type": {"Dynamic": 3},
+        }
+    """
+    counts = _get_fdb_counts(interface, vlan)
+    if "Vlan" in counts:
+        # JSON keys are strings
+        counts["Vlan"] = {int(vlan_id): count for vlan_id, count in counts["Vlan"].items()}
+
+    return counts
+
+
+def _pack_fdb_key(vlan, mac):
+    """Pack a Vlan and a MAC in a single integer: vlan << 48 | mac."""
+    return int(vlan) << 48 | int(mac.replace(":", ""), 16)
+
+
+def _unpack_fdb_key(key):
+    mac = "{:012X}".format(key & 0xFFFFFFFFFFFF)
+    return key >> 48, ":".join(high + low for high, low in zip(mac[::2], mac[1::2]))
+
+
+def _load_fdb_snapshot():
+    """Load the previous MAC table, None if there is none.
+
+    Per packed Vlan/MAC: [port, static, moves, last move timestamp].
+    """
+    data = _read_cache_file(FDB_SNAPSHOT_FILENAME)
+    if data is None:
         return None
 
+    ports = data["ports"]
+    entries = data["entries"]
+    snapshot = {}
+    for start in range(0, len(entries), FDB_SNAPSHOT_FIELDS):
+        end = start + FDB_SNAPSHOT_FIELDS
+        key, port, static, moves, last_move = entries[start:end]
+        snapshot[key] = [ports[port], static, moves, last_move]
+
+    return snapshot
+
+
+def _save_fdb_snapshot(snapshot):
+    """Store the MAC table as a flat list of integers, port names are stored once."""
+    ports = {}
+    entries = []
+    for key, (port, static, moves, last_move) in snapshot.items():
+        entries += [key, ports.setdefault(port, len(ports)), static, moves, last_move]
+
+    _write_cache_file(FDB_SNAPSHOT_FILENAME, {"ports": list(ports), "entries": entries})
+
+
+def _fdb_change(key, state, active):
+    port, static, moves, last_move = state
+    vlan, mac = _unpack_fdb_key(key)
+    return {
+        "Vlan": vlan,
+        "MacAddress": mac,
+        "Port": port,
+        "Type": "Static" if static else "Dynamic",
+        "Active": active,
+        "Moves": moves,
+        "LastMove": last_move,
+    }
+
+
+def get_mac_table_changes(napalm_output=False):
+    """Get the MAC entries learned, aged out and moved since the previous call.
+
+    The MAC table is kept on the minion between calls, with the number of moves of each entry
+    and the time of its last move. All entries are returned as learned at first call.
+
+    :param napalm_output: expose info in the same data structure than napalm (to ease integration)
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt "sonic.tor" sonic.get_mac_table_changes
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "learned": [],
+            "aged": [],
+            "moved": [
+                {
+                    "Vlan": 1000,
+                    "MacAddress": "00:53:00:01:02:03",
+                    "Port": "Ethernet4",
+                    "PreviousPort": "Ethernet0",
+                    "Type": "Dynamic",
+                    "Active": True,
+                    "Moves": 1,
+                    "LastMove": 1700000000.0,
+                }
+            ],
+        }
+    """
+    previous = _load_fdb_snapshot()
+    now = time.time()
+    snapshot = {}
+    changes = {"learned": [], "aged": [], "moved": []}
+
+    for entry in _get_fdb_entries():
+        key = _pack_fdb_key(entry["Vlan"], entry["MacAddress"])
+        port = entry["Port"]
+        static = int(entry["Type"] == "Static")
+        known = previous.pop(key, None) if previous is not None else None
+
+        if known is None:
+            snapshot[key] = [port, static, 0, None]
+            changes["learned"].append(_fdb_change(key, snapshot[key], active=True))
+        elif known[0] != port:
+            snapshot[key] = [port, static, known[2] + 1, now]
+            change = _fdb_change(key, snapshot[key], active=True)
+            change["PreviousPort"] = known[0]
+            changes["moved"].append(change)
+        else:
+            snapshot[key] = [port, static, known[2], known[3]]
+
+    for key, state in (previous or {}).items():
+        changes["aged"].append(_fdb_change(key, state, active=False))
+
+    _save_fdb_snapshot(snapshot)
+
+    for entries in changes.values():
+        entries.sort(key=lambda entry: (entry["Vlan"], entry["MacAddress"]))
+
     if napalm_output:
-        return _convert_mac_napalm_fmt(macport_info)
+        return {change: _convert_mac_napalm_fmt(entries) for change, entries in changes.items()}
 
-    return macport_info
+    return changes
 
 
 ##
@@ -634,7 +1301,7 @@ def configdb_config(template_name, context=None, saltenv="base", reload_conf=Fal
 ##
 
 
-def _extract_bgp_neighbor_info(neighbor_ip, bgp_data):
+def _extract_bgp_neighbor_info(neighbor_ip, bgp_data, vrf="default"):
     # Get the ip version: 4 for IPv4, 6 for IPv6
     ip_vers = ip_address(neighbor_ip).version
 
@@ -658,28 +1325,259 @@ def _extract_bgp_neighbor_info(neighbor_ip, bgp_data):
         "description": bgp_data.get("nbrDesc"),
         "import_policy": unicast_info.get("routeMapForIncomingAdvertisements"),
         "export_policy": unicast_info.get("routeMapForOutgoingAdvertisements"),
-        "vrf": "default",  # TODO: change once VRF is supported by SONiC
+        "vrf": vrf,
         "state": state,
     }
 
     return bgp_info
 
 
+def _extract_bgp_summary_info(summary):
+    """Get neighbors information of "show bgp summary json", per neighbor address.
+
+    Policies, peer group and description (before FRR 8) are not part of the summary.
+    """
+    result = {}
+
+    # one entry per address family (ipv4Unicast, ipv6Unicast...)
+    for family, family_data in summary.items():
+        if not isinstance(family_data, dict) or "peers" not in family_data:
+            continue
+
+        for neighbor_ip, peer in family_data["peers"].items():
+            bgp_info = result.setdefault(
+                neighbor_ip,
+                {
+                    "remote_as": peer["remoteAs"],
+                    "local_as": peer.get("localAs", family_data.get("as")),
+                    "remote_address": neighbor_ip,
+                    "peer_group": None,
+                    "description": peer.get("desc"),
+                    "import_policy": None,
+                    "export_policy": None,
+                    "vrf": family_data.get("vrfName", "default"),
+                    "state": "up" if peer["state"] == "Established" else "down",
+                    "address_family": {},
+                },
+            )
+            bgp_info["address_family"][family] = {
+                "received_prefixes": peer.get("pfxRcd"),
+                "sent_prefixes": peer.get("pfxSnt"),
+            }
+
+    return result
+
+
+def _get_bgp_summary():
+    return __salt__["cmd.run"]("vtysh -c 'show bgp summary json'")
+
+
 def _get_bgp_neighbor(neighbor):
     return __salt__["cmd.run"]("vtysh -c 'show bgp neighbor {} json'".format(neighbor))
 
 
-def get_bgp_neighbors(neighbor="", frr_output=False):
+def _get_bgp_neighbors_batch(neighbors, vrfs=None):
+    """Get several neighbors with a single vtysh call, outputs are concatenated.
+
+    vrfs is the VRF of each neighbor, default VRF if not set.
+    """
+    if vrfs is None:
+        commands = ["show bgp neighbor {} json".format(neighbor) for neighbor in neighbors]
+    else:
+        commands = [
+            "show bgp vrf {} neighbors {} json".format(vrf, neighbor)
+            for vrf, neighbor in zip(vrfs, neighbors)
+        ]
+    return __salt__["cmd.run"]("vtysh {}".format(" ".join("-c '{}'".format(c) for c in commands)))
+
+
+def _split_json_outputs(data):
+    """Split concatenated JSON documents (one per vtysh command)."""
+    decoder = json.JSONDecoder()
+    outputs = []
+    pos = 0
+
+    while True:
+        while pos < len(data) and data[pos].isspace():
+            pos += 1
+        if pos == len(data):
+            return outputs
+        try:
+            output, pos = decoder.raw_decode(data, pos)
+        except ValueError as exc:
+            raise CommandExecutionError("Unable to load BGP configuration") from exc
+        outputs.append(output)
+
+
+def _load_bgp_json(data):
+    try:
+        return json.loads(data)
+    except ValueError as exc:
+        raise CommandExecutionError("Unable to load BGP configuration") from exc
+
+
+def _get_bgp_all_vrfs(command):
+    """Run a show bgp command for all VRFs at once, output is per VRF name."""
+    return __salt__["cmd.run"]("vtysh -c 'show bgp vrf all {} json'".format(command))
+
+
+def _iter_vrf_neighbors(vrf_data):
+    """Iterate over neighbors of a VRF, skipping VRF attributes (vrfId, vrfName)."""
+    for neighbor_ip, data in vrf_data.items():
+        if isinstance(data, dict):
+            yield neighbor_ip, data
+
+
+def _get_bgp_vrf_neighbors_details(result, policies):
+    """Get FRR details of the neighbors of result (per VRF) whose policies are requested.
+
+    All the neighbors are read at once if policies is True, otherwise only the requested ones
+    with a single vtysh call.
+    """
+    if policies is True:
+        return _load_bgp_json(_get_bgp_all_vrfs("neighbors"))
+
+    requested = [
+        (vrf, neighbor_ip)
+        for vrf, vrf_result in result.items()
+        for neighbor_ip in vrf_result
+        if neighbor_ip in policies
+    ]
+    if not requested:
+        return {}
+
+    vrfs, neighbor_ips = zip(*requested)
+    outputs = _split_json_outputs(_get_bgp_neighbors_batch(neighbor_ips, vrfs))
+    if len(outputs) != len(requested):
+        raise CommandExecutionError("Unable to load BGP configuration")
+
+    details = {}
+    for vrf, output in zip(vrfs, outputs):
+        details.setdefault(vrf, {}).update(output)
+
+    return details
+
+
+def _get_bgp_neighbors_all_vrfs(neighbors, summary, policies):
+    """Get neighbors of all VRFs, per VRF, from a single vtysh call.
+
+    In summary mode, the neighbors whose policies are requested are read with another call.
+    """
+    if summary:
+        result = {
+            vrf: _extract_bgp_summary_info(vrf_summary)
+            for vrf, vrf_summary in _load_bgp_json(_get_bgp_all_vrfs("summary")).items()
+        }
+    else:
+        result = {
+            vrf: {
+                neighbor_ip: _extract_bgp_neighbor_info(neighbor_ip, data, vrf)
+                for neighbor_ip, data in _iter_vrf_neighbors(vrf_data)
+            }
+            for vrf, vrf_data in _load_bgp_json(_get_bgp_all_vrfs("neighbors")).items()
+        }
+
+    if neighbors:
+        missing = [
+            neighbor
+            for neighbor in neighbors
+            if not any(neighbor in vrf_result for vrf_result in result.values())
+        ]
+        if missing:
+            raise CommandExecutionError("No BGP session with {}".format(", ".join(missing)))
+        result = {
+            vrf: {ip: info for ip, info in vrf_result.items() if ip in neighbors}
+            for vrf, vrf_result in result.items()
+        }
+
+    policies = _to_list(policies) if policies is not True else policies
+    if not summary or not policies:
+        return result
+
+    details = _get_bgp_vrf_neighbors_details(result, policies)
+    for vrf, vrf_result in result.items():
+        for neighbor_ip, data in _iter_vrf_neighbors(details.get(vrf, {})):
+            if neighbor_ip in vrf_result and (policies is True or neighbor_ip in policies):
+                detail = _extract_bgp_neighbor_info(neighbor_ip, data, vrf)
+                for field in ("peer_group", "description", "import_policy", "export_policy"):
+                    vrf_result[neighbor_ip][field] = detail[field]
+
+    return result
+
+
+def _get_bgp_neighbors_data(neighbors):
+    """Get FRR details of the neighbors (all of them if none is given) with a single vtysh call."""
+    if len(neighbors) > 1:
+        outputs = _split_json_outputs(_get_bgp_neighbors_batch(neighbors))
+        if len(outputs) != len(neighbors):
+            raise CommandExecutionError("Unable to load BGP configuration")
+    else:
+        outputs = [_load_bgp_json(_get_bgp_neighbor(neighbors[0] if neighbors else ""))]
+
+    bgp_data = {}
+    missing = []
+    for neighbor, output in zip(neighbors or [""], outputs):
+        if output.get("bgpNoSuchNeighbor"):
+            missing.append(neighbor)
+        else:
+            bgp_data.update(output)
+
+    if missing:
+        raise CommandExecutionError("No BGP session with {}".format(", ".join(missing)))
+
+    return bgp_data
+
+
+def _get_bgp_neighbors_summary(neighbors, policies):
+    """Get neighbors state from the BGP summary, and policies of the requested neighbors only."""
+    result = _extract_bgp_summary_info(_load_bgp_json(_get_bgp_summary()))
+    if neighbors:
+        missing = [neighbor for neighbor in neighbors if neighbor not in result]
+        if missing:
+            raise CommandExecutionError("No BGP session with {}".format(", ".join(missing)))
+        result = {neighbor: result[neighbor] for neighbor in neighbors}
+
+    if policies is True:
+        policies = list(result)
+    policies = [neighbor_ip for neighbor_ip in _to_list(policies) if neighbor_ip in result]
+    if not policies:
+        return result
+
+    bgp_data = _get_bgp_neighbors_data(policies)
+    for neighbor_ip in policies:
+        if neighbor_ip in bgp_data:
+            detail = _extract_bgp_neighbor_info(neighbor_ip, bgp_data[neighbor_ip])
+            for field in ("peer_group", "description", "import_policy", "export_policy"):
+                result[neighbor_ip][field] = detail[field]
+
+    return result
+
+
+def get_bgp_neighbors(  # pylint: disable=too-many-positional-arguments
+    neighbor="", frr_output=False, summary=False, policies=None, neighbors=None, all_vrfs=False
+):
     """Get BGP neighbors information.
 
+    By default the full details of the neighbors are read from FRR. The summary mode only
+    reads the BGP summary (state, AS numbers and prefix counts per address family), and the
+    details of the neighbors whose policies are requested.
+
     :param neighbor: neighbor address
     :param frr_output: provide raw output from FRR
+    :param neighbors: list of neighbor addresses, read with a single vtysh call
+    :param summary: read the neighbors from the BGP summary
+    :param policies: in summary mode, list of neighbor addresses (or True for all neighbors)
+        to get the peer group, description and import/export policies of
+    :param all_vrfs: get the neighbors of all VRFs with a single FRR call, per VRF name
 
     CLI Example:
 
     .. code-block:: bash
 
         salt "sonic.tor" sonic.get_bgp_neighbors 192.0.2.1
+        salt "sonic.tor" sonic.get_bgp_neighbors neighbors=192.0.2.1,192.0.2.3
+        salt "sonic.tor" sonic.get_bgp_neighbors summary=True policies=192.0.2.1
+        salt "sonic.tor" sonic.get_bgp_neighbors all_vrfs=True
 
     Output example:
 
@@ -698,23 +1596,35 @@ def get_bgp_neighbors(neighbor="", frr_output=False):
                 "state": "up",
             }
         }
-    """
-    # enforce empty string when neighbor is None
-    if not neighbor:
-        neighbor = ""
 
-    data = _get_bgp_neighbor(neighbor)
+    With all_vrfs, neighbors are returned per VRF: {"default": {"192.0.2.1": {...}}, ...}
 
-    try:
-        bgp_data = json.loads(data)
-    except KeyError as exc:
-        raise CommandExecutionError("Unable to load BGP configuration") from exc
+    In summary mode, fields not requested are None and prefix counts are added:
 
-    if not bgp_data:
-        return {}
+    .. code-block:: python
 
-    if bgp_data.get("bgpNoSuchNeighbor"):
-        raise CommandExecutionError("No BGP session with {}".format("neighbor_ip"))
+        {
+            "192.0.2.1": {
+                ...
+                "address_family": {
+                    "ipv4Unicast": {"received_prefixes": 10, "sent_prefixes": 12},
+                },
+            }
+        }
+    """
+    neighbors = _to_list(neighbor) + _to_list(neighbors)
+
+    if all_vrfs:
+        if frr_output:
+            return _load_bgp_json(_get_bgp_all_vrfs("summary" if summary else "neighbors"))
+        return _get_bgp_neighbors_all_vrfs(neighbors, summary, policies)
+
+    if summary:
+        if frr_output:
+            return _load_bgp_json(_get_bgp_summary())
+        return _get_bgp_neighbors_summary(neighbors, policies)
+
+    bgp_data = _get_bgp_neighbors_data(neighbors)
 
     if frr_output:
         return bgp_data
@@ -787,10 +1697,47 @@ def save_bgp_config():
 
         salt "sonic.tor" sonic.save_bgp_config
     """
+    frr_file_mtime = _get_frr_file_mtime()
     __salt__["cmd.run"]("vtysh --writeconfig")
+    _restamp_bgp_fingerprints(frr_file_mtime)
     return True
 
 
+def get_policy_inventory():
+    """Get the route-maps, prefix-lists and community-lists of the running BGP config.
+
+    Each object has its number of entries (route-map sequences, prefix-list or community-list
+    lines) and a fingerprint of its content, which is the same for two objects with the same
+    entries. The inventory is kept for the rest of the job, until a BGP config is pushed.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt "sonic.tor" sonic.get_policy_inventory
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "route_maps": {
+                "FABRIC-IN": {"entries": 3, "fingerprint": "0f3c..."},
+                "FABRIC-OUT": {"entries": 2, "fingerprint": "9a1b..."},
+            },
+            "ipv4_prefix_lists": {"PF-DEFAULT": {"entries": 1, "fingerprint": "77d2..."}},
+            "ipv6_prefix_lists": {},
+            "community_lists": {"CL-CLOS_SERVER": {"entries": 1, "fingerprint": "c41e..."}},
+        }
+    """
+    if "sonic.policy_inventory" not in __context__:
+        __context__["sonic.policy_inventory"] = __utils__["frr_detect_diff.get_inventory"](
+            get_bgp_config()
+        )
+
+    return __context__["sonic.policy_inventory"]
+
+
 def get_route_maps():
     """Get route-map list set on a device.
 
@@ -805,14 +1752,13 @@ def get_route_maps():
     .. code-block:: python
 
         [
-            "FABRIC-OUT",
-            "FABRIC_MAINTENANCE-OUT",
             "DENY",
             "FABRIC-IN",
+            "FABRIC-OUT",
+            "FABRIC_MAINTENANCE-OUT",
         ]
     """
-    cmd = "vtysh -c 'show route-map' | awk '/route-map/ {print $2}' | sort -u"
-    return __salt__["cmd.shell"](cmd).split("\n")
+    return sorted(get_policy_inventory()["route_maps"])
 
 
 def _upload_candidate_bgp_config(remote_tmpfile, content):
@@ -823,14 +1769,15 @@ def _clean_candidate_bgp_config(remote_tmpfile):
     __salt__["file.remove"](remote_tmpfile)
 
 
-def _push_bgp_config(remote_tmpfile):
+def _push_bgp_config(remote_tmpfile, save=True):
     # return nothing if done with success
     res = __salt__["cmd.run"]("sudo vtysh --inputfile {}".format(remote_tmpfile))
 
     if res:
         return res
 
-    __salt__["cmd.run"]("sudo vtysh --writeconfig")
+    if save:
+        __salt__["cmd.run"]("sudo vtysh --writeconfig")
     return ""
 
 
@@ -838,10 +1785,156 @@ def _check_candidate_bgp_config(remote_tmpfile):
     return __salt__["cmd.run"]("sudo vtysh --dryrun --inputfile {}".format(remote_tmpfile))
 
 
-def bgp_config(template_name, context=None, push_only_if_changes=False, saltenv="base", test=False):
+def _get_frr_file_mtime():
+    try:
+        return os.stat(FRR_FILE).st_mtime
+    except OSError:
+        return None
+
+
+def _load_bgp_fingerprints():
+    """Load the fingerprints of the routing policy objects, None if they may be stale.
+
+    They are stale if the startup config was saved since (by someone else), or if they are too
+    old: changes made with vtysh and not saved are not detected otherwise. They may also be
+    stale if they are not saved to the startup config: FRR would lose them on restart.
+    """
+    data = _read_cache_file(BGP_FINGERPRINTS_FILENAME)
+    if data is None or not data.get("saved"):
+        return None
+
+    if data["frr_file_mtime"] is None or data["frr_file_mtime"] != _get_frr_file_mtime():
+        return None
+
+    if time.time() - data["timestamp"] > BGP_FINGERPRINTS_MAX_AGE:
+        return None
+
+    return data["fingerprints"]
+
+
+def _is_bgp_config_saved(config):
+    """Check if all the lines of a running config are in the startup config."""
+    try:
+        with open(FRR_FILE, encoding="utf-8") as fd:
+            startup_config = fd.read()
+    except OSError:
+        return False
+
+    startup_fingerprints = __utils__["frr_detect_diff.get_fingerprints"](startup_config)
+    return not __utils__["frr_detect_diff.list_changed_fingerprints"](startup_fingerprints, config)
+
+
+def _save_bgp_fingerprints(config, saved=None):
+    """Store the fingerprints of the routing policy objects of the running config, return them.
+
+    saved is True if the running config was just saved to the startup config, False if it was
+    changed and not saved. If None, the startup config is checked.
+    """
+    if saved is None:
+        saved = _is_bgp_config_saved(config)
+
+    fingerprints = __utils__["frr_detect_diff.get_fingerprints"](config)
+    _write_cache_file(
+        BGP_FINGERPRINTS_FILENAME,
+        {
+            "frr_file_mtime": _get_frr_file_mtime(),
+            "timestamp": time.time(),
+            "saved": saved,
+            "fingerprints": fingerprints,
+        },
+    )
+
+    return fingerprints
+
+
+def _restamp_bgp_fingerprints(frr_file_mtime):
+    """Keep the fingerprints valid when the startup config is saved after a push without save.
+
+    frr_file_mtime is the modification time of the startup config before it was saved.
+    """
+    data = _read_cache_file(BGP_FINGERPRINTS_FILENAME)
+    if data is None or data.get("saved") or data["frr_file_mtime"] != frr_file_mtime:
+        return
+
+    data["frr_file_mtime"] = _get_frr_file_mtime()
+    data["saved"] = True
+    _write_cache_file(BGP_FINGERPRINTS_FILENAME, data)
+
+
+def _apply_bgp_config(remote_tmpfile, rendered, push_only_if_changes, save, test):
+    """Push the changes of the rendered config, return result, changes and comment.
+
+    If push_only_if_changes, changes are detected with the fingerprints stored after the last
+    push, the running config is read only if they are stale. Nothing is pushed (nor saved) if
+    there are no changes. The changes are checked before, in test mode they are not pushed.
+    """
+    current = None
+    if push_only_if_changes:
+        fingerprints = _load_bgp_fingerprints()
+        if fingerprints is None:
+            current = get_bgp_config()
+            fingerprints = _save_bgp_fingerprints(current)
+
+        if not __utils__["frr_detect_diff.list_changed_fingerprints"](fingerprints, rendered):
+            return True, None, "- No changes detected:\n{}".format(rendered)
+
+    # the stored fingerprints (if any) were not computed from the running config just read
+    refresh_fingerprints = current is None
+    if current is None:
+        current = get_bgp_config()
+
+    # push only the changed routing policy objects, and other lines only if some changed
+    delta = __utils__["frr_detect_diff.get_delta_config"](current, rendered)
+    if not delta:
+        # stored fingerprints which found changes are stale
+        if refresh_fingerprints:
+            _save_bgp_fingerprints(current)
+        return True, None, "- No changes detected:\n{}".format(rendered)
+
+    _upload_candidate_bgp_config(remote_tmpfile, delta)
+    out = _check_candidate_bgp_config(remote_tmpfile)
+
+    if __context__["retcode"] != 0:
+        _clean_candidate_bgp_config(remote_tmpfile)
+        raise CommandExecutionError("Invalid BGP configuration: {}".format(out))
+
+    if test:
+        return None, None, "- Configuration discarded:\n{}".format(delta)
+
+    out = _push_bgp_config(remote_tmpfile, save)
+
+    if __context__["retcode"] != 0:
+        _clean_candidate_bgp_config(remote_tmpfile)
+        # raise CommandExecutionError("Unable to push BGP configuration: {}".format(out))
+        comment = "- Unable to push BGP configuration: {}".format(out)
+        result = False
+    elif save:
+        result = True
+        comment = "- Configuration pushed and loaded:\n{}".format(delta)
+    else:
+        result = True
+        comment = "- Configuration pushed and loaded, not saved yet:\n{}".format(delta)
+
+    # even after a failure, as some lines may have been applied
+    __context__.pop("sonic.policy_inventory", None)
+    new_config = get_bgp_config()
+    _save_bgp_fingerprints(new_config, saved=save and result)
+
+    return result, _diff(current, new_config), comment
+
+
+def bgp_config(  # pylint: disable=too-many-positional-arguments
+    template_name, context=None, push_only_if_changes=False, saltenv="base", test=False, save=True
+):
     """Push configuration changes to FRR, and save startup config.
 
     It does not replace the current configuration, it pushed line by line the config.
+    Route-maps, prefix-lists and community-lists are the exception: only the changed ones are
+    pushed, with the commands replacing them by their rendered version (entries missing from the
+    template are removed). Other lines are pushed only if one of them is missing from the running
+    config (router bgp, address-family and interface blocks are compared as a tree), nothing is
+    pushed nor saved if there are no changes. See details in _utils.frr_detect_diff module.
+    The config to push is checked with vtysh --dryrun, in test mode it is not pushed.
 
     FRR /etc/frr must be a mounted volume to /etc/sonic/frr.
 
@@ -850,12 +1943,17 @@ def bgp_config(template_name, context=None, push_only_if_changes=False, saltenv=
     :param push_only_if_changes: push the config only if there are changes detected
     :param saltenv: Salt environment
     :param test: test mode (dry run)
+    :param save: save the startup config after the push, if False it must be saved later with
+        save_bgp_config (sonic.managed saves it once after all its BGP templates)
 
     Important notices:
     - lines pushed are applied line by line, so it can result in mixed up configuration
     if you already have configuration
-    - push_only_if_changes parameters only check if there are changes in routing_policy!
-    see details in _utils.frr_detect_diff module.
+    - push_only_if_changes parameters compares the rendered config to fingerprints of the
+    running config kept in the minion cache since the last push, instead of reading the running
+    config. It is read only if they are stale (startup config saved by someone else, running
+    config not saved, or older than a day): changes made with vtysh and not saved are not
+    detected meanwhile.
 
     Output example:
 
@@ -882,43 +1980,11 @@ def bgp_config(template_name, context=None, push_only_if_changes=False, saltenv=
     log.debug("configuration to push: %s", rendered)
 
     # push and merge the config
-    now = int(datetime.now().timestamp())
     __salt__["file.mkdir"]("/etc/sonic/tmp/")
-    remote_tmpfile = "/etc/sonic/tmp/.{}_bgp.patch".format(now)
-    _upload_candidate_bgp_config(remote_tmpfile, rendered)
-
-    out = _check_candidate_bgp_config(remote_tmpfile)
-
-    if __context__["retcode"] != 0:
-        raise CommandExecutionError("Invalid BGP configuration: {}".format(out))
-
-    if test:
-        changes = None
-        result = None
-        comment = "- Configuration discarded:\n{}".format(rendered)
-    else:
-        current = get_bgp_config()
-
-        if push_only_if_changes and not __utils__["frr_detect_diff.is_different"](
-            current, rendered
-        ):
-            changes = None
-            result = True
-            comment = "- No changes detected in routing_policy:\n{}".format(rendered)
-        else:
-            out = _push_bgp_config(remote_tmpfile)
-
-            if __context__["retcode"] != 0:
-                _clean_candidate_bgp_config(remote_tmpfile)
-                # raise CommandExecutionError("Unable to push BGP configuration: {}".format(out))
-                comment = "- Unable to push BGP configuration: {}".format(out)
-                result = False
-            else:
-                result = True
-                comment = "- Configuration pushed and loaded"
-
-            new_config = get_bgp_config()
-            changes = _diff(current, new_config)
+    remote_tmpfile = "/etc/sonic/tmp/.{}_bgp.patch".format(int(datetime.now().timestamp()))
+    result, changes, comment = _apply_bgp_config(
+        remote_tmpfile, rendered, push_only_if_changes, save, test
+    )
 
     _clean_candidate_bgp_config(remote_tmpfile)
 
@@ -0,0 +1 @@
+"""Runners Directory."""
@@ -0,0 +1,89 @@
+"""SONiC runner module.
+
+It aims to contain the functions which need to query several SONiC devices at once.
+"""
+
+import re
+
+import salt.client
+
+__virtualname__ = "sonic"
+
+# ports on which a MAC can be learned from another switch
+UPLINK_PORTS = r"^(PortChannel|Vlan|Vxlan|oid:)"
+
+
+def __virtual__():
+    return __virtualname__
+
+
+def _get_client():
+    return salt.client.get_local_client(__opts__["conf_file"])
+
+
+def locate_mac(  # pylint: disable=too-many-positional-arguments
+    mac, tgt="nos:sonic", tgt_type="grain", batch_size=10, uplink_ports=UPLINK_PORTS, timeout=None
+):
+    """Find the switch and the edge port where a MAC is learned.
+
+    Switches are queried with sonic.get_port_from_mac by batches of batch_size switches, and no
+    other batch is started once the MAC is found on an edge port (a port which is not an uplink).
+
+    :param mac: MAC address
+    :param tgt: switches to query, default all SONiC devices
+    :param tgt_type: targeting type of tgt (glob, grain, list...)
+    :param batch_size: number of switches queried at the same time
+    :param uplink_ports: regex of the ports which are not edge ports, default port-channels,
+        Vlan and VXLAN interfaces (ex: "^(PortChannel|Ethernet12[0-9])")
+    :param timeout: seconds to wait for a switch to answer
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run sonic.locate_mac 00:53:00:01:02:03 tgt="sonic.tor*" tgt_type=glob
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "edge": {"minion": "sonic.tor1", "port": "Ethernet0", "vlan": 1000},
+            "uplinks": {"sonic.tor2": ["PortChannel1"]},
+            "queried": 14,
+        }
+    """
+    uplink_re = re.compile(uplink_ports)
+    kwargs = {"timeout": timeout} if timeout else {}
+    result = {"edge": None, "uplinks": {}, "queried": 0}
+
+    returns = _get_client().cmd_batch(
+        tgt,
+        "sonic.get_port_from_mac",
+        arg=[mac],
+        tgt_type=tgt_type,
+        batch=str(batch_size),
+        **kwargs,
+    )
+    for minion_ret in returns:
+        for minion, entries in minion_ret.items():
+            result["queried"] += 1
+            # None if unknown, a string on error, {} on timeout
+            if not isinstance(entries, list):
+                continue
+
+            for entry in entries:
+                if uplink_re.match(str(entry["Port"])):
+                    result["uplinks"].setdefault(minion, []).append(entry["Port"])
+                elif result["edge"] is None:
+                    result["edge"] = {
+                        "minion": minion,
+                        "port": entry["Port"],
+                        "vlan": entry["Vlan"],
+                    }
+
+        if result["edge"]:
+            # stop consuming the returns: no other batch is started
+            break
+
+    return result
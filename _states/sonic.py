@@ -22,16 +22,45 @@ def __virtual__():
     return __salt__["grains.get"]("nos") == "sonic"
 
 
-def _bgp(template, context, saltenv, **_):
-    return __salt__["sonic.bgp_config"](
+def _bgp_template(template, context, saltenv, pending_save):
+    result = __salt__["sonic.bgp_config"](
         template_name=template,
         context=context,
         saltenv=saltenv,
         test=__opts__["test"],
+        save=False,
     )
 
+    if result["result"] and result["changes"] is not None:
+        pending_save.append(template)
 
-def _config_db(template, context, saltenv, reload_conf):
+    return result
+
+
+def _bgp(template, context, saltenv, pending_save, **_):
+    if isinstance(template, str):
+        return _bgp_template(template, context, saltenv, pending_save)
+
+    # several templates: stop at the first failure
+    ret = {"result": True, "changes": {}, "comment": None}
+    comments = []
+    for name in template:
+        result = _bgp_template(name, context, saltenv, pending_save)
+
+        comments.append("* {}\n{}".format(name, result["comment"]))
+        ret["changes"][name] = result["changes"]
+        if result["result"] is False:
+            ret["result"] = False
+            break
+        if result["result"] is None:
+            ret["result"] = None
+
+    ret["comment"] = "\n".join(comments)
+
+    return ret
+
+
+def _config_db(template, context, saltenv, reload_conf, **_):
     return __salt__["sonic.configdb_config"](
         template_name=template,
         context=context,
@@ -53,28 +82,42 @@ def _snmp(template, context, saltenv, **_):
 def managed(name, templates, context=None, saltenv="base", reload_conf=False):
     """Manage full configuration.
 
+    BGP templates are pushed without saving the FRR startup config, it is saved once after all
+    sections, even if a section fails.
+
     :param name: title of the action
-    :param templates: dict of Jinja templates, supported keys: bgp, config_db, snmp
+    :param templates: dict of Jinja templates, supported keys: bgp, config_db, snmp. bgp can be a
+        list of templates, pushed in order.
     :param context: variables to map with the templates
     :param saltenv: Salt environment
     """
     section_function = {"bgp": _bgp, "config_db": _config_db, "snmp": _snmp}
     ret = {"name": name, "result": True, "changes": {}, "comment": None}
     comments = {}
-
-    for section, template in templates.items():
-        if section not in section_function:
-            comments[section] = "unsupported"
-            continue
-
-        result = section_function[section](
-            template=template, context=context, saltenv=saltenv, reload_conf=reload_conf
-        )
-
-        comments[section] = result["comment"]
-        ret["changes"][section] = result["changes"]
-        if result["result"] is not None:
-            ret["result"] &= result["result"]
+    pending_save = []
+
+    try:
+        for section, template in templates.items():
+            if section not in section_function:
+                comments[section] = "unsupported"
+                continue
+
+            result = section_function[section](
+                template=template,
+                context=context,
+                saltenv=saltenv,
+                reload_conf=reload_conf,
+                pending_save=pending_save,
+            )
+
+            comments[section] = result["comment"]
+            ret["changes"][section] = result["changes"]
+            if result["result"] is not None:
+                ret["result"] &= result["result"]
+    finally:
+        # single write of the BGP pushes
+        if pending_save:
+            __salt__["sonic.save_bgp_config"]()
 
     if ret["result"] and __opts__["test"]:
         ret["result"] = None
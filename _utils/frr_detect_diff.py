@@ -5,86 +5,207 @@ Supported:
 - prefix-lists
 - community-list
 
-It won't expose the change, nor provide the command to solve the diff.
+It lists the changed objects, and provides the minimal commands to apply the changes of these
+objects. Prefix-list entries without sequence number are numbered like FRR does, to be compared
+to the running config.
+
+Other lines (router bgp, address-family, interface...) are compared as a tree: a candidate line
+is a change if it is not in the reference config under the same blocks. They are pushed as is,
+and only if one of them is a change.
 
 This script will be removed when FRR developers will finish the development of Northbound API.
 """
 
+import hashlib
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+OBJECT_TYPES = ("route_maps", "ipv4_prefix_lists", "ipv6_prefix_lists", "community_lists")
+
+# one alternative per supported object, the group name is the object type
+OBJECT_RE = re.compile(
+    r"route-map (?P<route_maps>\S+)"
+    r"|ip prefix-list (?P<ipv4_prefix_lists>\S+)"
+    r"|ipv6 prefix-list (?P<ipv6_prefix_lists>\S+)"
+    r"|bgp community-list \S+ (?P<community_lists>\S+)"
+)
+
+# sequence number of a prefix-list entry, missing if FRR numbers it
+SEQUENCE_RE = re.compile(r" (?:seq (?P<sequence>\d+) )?(?=permit |deny )")
+
+# sequence number of a route-map or prefix-list entry, FRR replaces an entry with the same one
+ENTRY_KEY_RE = re.compile(r"route-map \S+ \S+ (\d+)$|(?:ip|ipv6) prefix-list \S+ seq (\d+) ")
+
+# objects which can be referenced by route-maps are updated first
+DELTA_ORDER = ("ipv4_prefix_lists", "ipv6_prefix_lists", "community_lists", "route_maps")
+
+# blocks ending with an exit keyword, per first word
+BLOCK_EXITS = {
+    "address-family": "exit-address-family",
+    "vni": "exit-vni",
+    "vrf": "exit-vrf",
+}
+
+# parsed configs per content hash, as a same running config is compared to several candidates
+PARSED_CONFIGS_MAX = 8
+_PARSED_CONFIGS = OrderedDict()
 
 
 def __virtual__():
     return __grains__.get("nos") == "sonic"
 
 
-def _get_indentation_level(line):
-    nb_leading_spaces = len(line) - len(line.lstrip())
-    return nb_leading_spaces
+def _add_line(lines, blocks, stripped_line, indentation):
+    """Add a line which is not part of a supported object to the config tree.
+
+    A line is nested in the last line less indented, except in address-family (and vni, vrf)
+    blocks which end with their exit keyword or with a new top-level line.
+    """
+    while blocks and indentation <= blocks[-1][1]:
+        blocks.pop()
+
+    if stripped_line.startswith("!") or stripped_line == "exit":
+        return
+
+    if stripped_line in BLOCK_EXITS.values():
+        while blocks:
+            if blocks.pop()[2] == stripped_line:
+                break
+        return
+
+    block_exit = BLOCK_EXITS.get(stripped_line.split(" ", 1)[0])
+    for index, block in enumerate(blocks):
+        if block_exit and block[2] == block_exit:
+            # the previous block of a same kind ends without its exit keyword
+            del blocks[index:]
+            break
+
+    path = (blocks[-1][0] if blocks else ()) + (stripped_line,)
+    lines[path] = None
 
+    if block_exit and blocks:
+        # only a line less indented than the parent ends the block
+        blocks.append((path, blocks[-1][1], block_exit))
+    else:
+        blocks.append((path, indentation, None))
 
-def _group_config_per_object(config):
-    """Group all config line per objects (one per route-map for instance)."""
-    objects = {}
-    previous_object = set()
-    indentation_previous_object = 0
+
+def _number_entry(line, position, sequences, name):
+    """Add the sequence number FRR would give to a prefix-list entry without one.
+
+    FRR numbers it after the highest sequence number of the list, rounded down to a multiple of
+    5, plus 5.
+    """
+    matches = SEQUENCE_RE.match(line, position)
+    if not matches:
+        return line
+
+    if matches.group("sequence") is not None:
+        sequence = int(matches.group("sequence"))
+    else:
+        sequence = sequences.get(name, 0) // 5 * 5 + 5
+        action = matches.end()
+        line = "{} seq {} {}".format(line[:position], sequence, line[action:])
+
+    sequences[name] = max(sequences.get(name, 0), sequence)
+    return line
+
+
+def _parse_config(config):
+    """Parse a config in a single pass.
+
+    For the supported objects, a line more indented than the last top-level line is a statement
+    of that entry. If a same top-level line appears twice, the last statements are kept at the
+    position of the first one. Prefix-list entries are numbered if they have no sequence number.
+
+    Other lines are kept as paths in the config tree (router bgp, address-family, interface...).
+
+    Output: ({object type: {name: {entry header: [statements]}}}, {path: None})
+    """
+    entries = {object_type: {} for object_type in OBJECT_TYPES}
+    lines = {}
+    blocks = []
+    statements = None
+    object_indentation = 0
+    # highest sequence number per prefix-list
+    sequences = {}
 
     for line in config.split("\n"):
         stripped_line = line.lstrip()
+        # blank lines (left by Jinja tags) are not part of the config, like comments
+        if not stripped_line or stripped_line == "!":
+            continue
 
-        if stripped_line == "!":
+        indentation = len(line) - len(stripped_line)
+        if indentation > object_indentation:
+            if statements is not None:
+                statements.append(stripped_line)
+            else:
+                _add_line(lines, blocks, stripped_line, indentation)
             continue
 
-        current_indentation = _get_indentation_level(line)
+        object_indentation = indentation
+        matches = OBJECT_RE.match(stripped_line)
+        if not matches:
+            statements = None
+            blocks = []
+            _add_line(lines, blocks, stripped_line, indentation)
+            continue
 
-        if current_indentation > indentation_previous_object:
-            previous_object.add(stripped_line)
-        else:
-            objects[stripped_line] = set()
-            previous_object = objects[stripped_line]
-            indentation_previous_object = current_indentation
+        statements = []
+        object_type = matches.lastgroup
+        name = matches.group(object_type)
+        if object_type in ("ipv4_prefix_lists", "ipv6_prefix_lists"):
+            stripped_line = _number_entry(
+                stripped_line, matches.end(), sequences, (object_type, name)
+            )
+        entries[object_type].setdefault(name, {})[stripped_line] = statements
 
-    return objects
+    return entries, lines
 
 
-def _filter_objects(config):
-    """Keep supported objects only."""
-    regex_mapping = {
-        "route_maps": r"route-map (\S+).*",
-        "ipv4_prefix_lists": r"ip prefix-list (\S+).*",
-        "ipv6_prefix_lists": r"ipv6 prefix-list (\S+).*",
-        "community_lists": r"bgp community-list \S+ (\S+).*",
-    }
-    objects = {
-        "route_maps": {},
-        "ipv4_prefix_lists": {},
-        "ipv6_prefix_lists": {},
-        "community_lists": {},
-    }
+def _get_parsed_config(config):
+    """Get the parsed config, cached per content of the config."""
+    digest = hashlib.sha256(config.encode("utf-8")).hexdigest()
+    if digest in _PARSED_CONFIGS:
+        _PARSED_CONFIGS.move_to_end(digest)
+        return _PARSED_CONFIGS[digest]
 
-    for key, value in config.items():
-        for object_type, regex in regex_mapping.items():
-            matches = re.match(regex, key)
-            if not matches:
-                continue
+    parsed = _parse_config(config)
+    _PARSED_CONFIGS[digest] = parsed
+    if len(_PARSED_CONFIGS) > PARSED_CONFIGS_MAX:
+        _PARSED_CONFIGS.popitem(last=False)
 
-            if matches.group(1) not in objects[object_type]:
-                objects[object_type][matches.group(1)] = []
+    return parsed
 
-            if value:
-                objects[object_type][matches.group(1)].append(value)
-            else:
-                objects[object_type][matches.group(1)].append(key)
 
-    return objects
+def _format_path(path):
+    return " > ".join(path)
 
 
 def get_objects(config):
-    """Get all objects from config."""
-    groups = _group_config_per_object(config)
-    objects = _filter_objects(groups)
+    """Get all objects from config.
+
+    An entry is represented by its header and its set of statements.
+    """
+    return {
+        object_type: {
+            name: {header: set(statements) for header, statements in object_entries.items()}
+            for name, object_entries in objects.items()
+        }
+        for object_type, objects in _get_parsed_config(config)[0].items()
+    }
 
-    return objects
+
+def _is_changed(reference_entries, candidate_entries):
+    """Check if an object changed, like comparing their get_objects output without building it."""
+    if reference_entries is None or reference_entries.keys() != candidate_entries.keys():
+        return True
+
+    return any(
+        set(statements) != set(reference_entries[header])
+        for header, statements in candidate_entries.items()
+    )
 
 
 def list_changed_objects(reference_config, candidate_changes):
@@ -92,33 +213,244 @@ def list_changed_objects(reference_config, candidate_changes):
 
     This only checks if candidate changes would change the reference configuration.
 
-    Supports only:
-    - route-maps
-    - prefix-lists
-    - community-lists
+    Route-maps, prefix-lists and community-lists are listed per name, other lines missing from
+    the reference config are listed in "lines" with their blocks.
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "route_maps": ["RM-CLOS-IN"],
+            "lines": ["router bgp 65000 > address-family ipv4 unicast > network 10.0.0.0/24"],
+        }
     """
-    reference_objects = get_objects(reference_config)
-    candidate_objects = get_objects(candidate_changes)
+    reference_entries, reference_lines = _get_parsed_config(reference_config)
 
     detected_diff = defaultdict(list)
-    for section, objects in candidate_objects.items():
-        for name, statements in objects.items():
-            if statements != reference_objects.get(section, {}).get(name):
+    for section, objects in _get_parsed_config(candidate_changes)[0].items():
+        for name, object_entries in objects.items():
+            if _is_changed(reference_entries[section].get(name), object_entries):
                 detected_diff[section].append(name)
 
+    for path in _get_parsed_config(candidate_changes)[1]:
+        if path not in reference_lines:
+            detected_diff["lines"].append(_format_path(path))
+
     return dict(detected_diff)
 
 
 def is_different(reference_config, candidate_changes):
-    """Check if there are difference detected between conf and candidate changes.
-
-    Supports only:
-    - route-maps
-    - prefix-lists
-    - community-lists
-    """
+    """Check if there are difference detected between conf and candidate changes."""
     detected_diff = list_changed_objects(reference_config, candidate_changes)
 
     is_config_different = any((section for section in detected_diff.values()))
 
     return is_config_different
+
+
+def _negate(command):
+    if command.startswith("no "):
+        return command[3:]
+
+    return "no {}".format(command)
+
+
+def _get_entry_key(header):
+    """Get the sequence number of a route-map or prefix-list entry, else its header."""
+    matches = ENTRY_KEY_RE.match(header)
+    if not matches:
+        return header
+
+    return matches.group(matches.lastindex)
+
+
+def _get_object_commands(reference_entries, candidate_entries):
+    """Get the commands to replace the entries of an object by the candidate ones.
+
+    New entries are added before the entries missing from the candidate are removed, so that
+    the object is never empty. FRR replaces an entry by a new one with the same sequence number,
+    except route-map entries which are removed first to not keep their statements. Statements
+    of an entry are removed before the new ones are added, as "no set ..." removes any value.
+    Unchanged entries are skipped.
+    """
+    reference_headers = {_get_entry_key(header): header for header in reference_entries}
+    replaced = set()
+    commands = []
+
+    for header, statements in candidate_entries.items():
+        reference_header = reference_headers.get(_get_entry_key(header))
+        replaced.add(reference_header)
+        if reference_header != header:
+            if reference_header is not None and header.startswith("route-map "):
+                commands.append(_negate(reference_header))
+            commands.append(header)
+            commands.extend(" {}".format(statement) for statement in statements)
+            continue
+
+        reference_statements = reference_entries[header]
+        removed = [statement for statement in reference_statements if statement not in statements]
+        added = [statement for statement in statements if statement not in reference_statements]
+        if removed or added:
+            commands.append(header)
+            commands.extend(" {}".format(_negate(statement)) for statement in removed)
+            commands.extend(" {}".format(statement) for statement in added)
+
+    commands.extend(_negate(header) for header in reference_entries if header not in replaced)
+
+    return commands
+
+
+def _get_other_lines(config):
+    """Get the lines of a config which are not part of a supported object."""
+    lines = []
+    supported = False
+    object_indentation = 0
+
+    for line in config.split("\n"):
+        stripped_line = line.lstrip()
+        if not stripped_line or stripped_line == "!":
+            continue
+
+        indentation = len(line) - len(stripped_line)
+        if indentation <= object_indentation:
+            object_indentation = indentation
+            supported = OBJECT_RE.match(stripped_line) is not None
+
+        if not supported:
+            lines.append(line)
+
+    return lines
+
+
+def get_delta_config(reference_config, candidate_changes):
+    """Get the minimal config to push to apply candidate changes on reference config.
+
+    Like frr-reload, each changed object is replaced by its candidate version with the commands
+    adding and removing its entries and statements, unchanged objects are skipped. Objects
+    missing from candidate changes are kept. Other lines of the candidate changes are kept as is,
+    after the objects, if one of them is missing from reference config.
+
+    It is empty if there are no changes.
+
+    Output example:
+
+    .. code-block:: text
+
+        ip prefix-list PF-DEFAULT seq 10 permit 0.0.0.0/0 le 24
+        no ip prefix-list PF-DEFAULT seq 20 permit 10.0.0.0/8
+        !
+        route-map RM-CLOS-IN permit 20
+         no set local-preference 100
+         set local-preference 200
+        !
+        router bgp 65000
+         neighbor PG-L3_SP peer-group
+    """
+    reference_entries = _get_parsed_config(reference_config)[0]
+    candidate_entries = _get_parsed_config(candidate_changes)[0]
+    detected_diff = list_changed_objects(reference_config, candidate_changes)
+
+    lines = []
+    for section in DELTA_ORDER:
+        for name in detected_diff.get(section, []):
+            commands = _get_object_commands(
+                reference_entries[section].get(name, {}), candidate_entries[section][name]
+            )
+            if commands:
+                lines.extend(commands)
+                lines.append("!")
+
+    if "lines" in detected_diff:
+        lines.extend(_get_other_lines(candidate_changes))
+
+    return "".join("{}\n".format(line) for line in lines)
+
+
+def _fingerprint(object_entries):
+    """Hash an object, two objects have a same hash if list_changed_objects finds them equal."""
+    digest = hashlib.sha256()
+    for header in sorted(object_entries):
+        statements = sorted(set(object_entries[header]))
+        digest.update("{}\n{}\0".format(header, "\n".join(statements)).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def _fingerprint_path(path):
+    """Hash a line and its blocks, shortened as there is one per line."""
+    return hashlib.sha256("\n".join(path).encode("utf-8")).hexdigest()[:16]
+
+
+def get_fingerprints(config):
+    """Get a fingerprint per object from config, and one per other line.
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "route_maps": {"RM-CLOS-IN": "0f3c...", "RM-CLOS-OUT": "9a1b..."},
+            "ipv4_prefix_lists": {"PF-DEFAULT": "77d2..."},
+            "ipv6_prefix_lists": {},
+            "community_lists": {"CL-CLOS_SERVER": "c41e..."},
+            "lines": ["03a9b1f0c2d4e5f6", "1b2c..."],
+        }
+    """
+    entries, lines = _get_parsed_config(config)
+    fingerprints = {
+        object_type: {
+            name: _fingerprint(object_entries) for name, object_entries in objects.items()
+        }
+        for object_type, objects in entries.items()
+    }
+    fingerprints["lines"] = sorted(_fingerprint_path(path) for path in lines)
+
+    return fingerprints
+
+
+def get_inventory(config):
+    """Get the number of entries and the fingerprint of each object from config.
+
+    An entry is a route-map sequence, or a prefix-list or community-list line.
+
+    Output example:
+
+    .. code-block:: python
+
+        {
+            "route_maps": {"RM-CLOS-IN": {"entries": 2, "fingerprint": "0f3c..."}},
+            "ipv4_prefix_lists": {"PF-DEFAULT": {"entries": 1, "fingerprint": "77d2..."}},
+            "ipv6_prefix_lists": {},
+            "community_lists": {"CL-CLOS_SERVER": {"entries": 1, "fingerprint": "c41e..."}},
+        }
+    """
+    return {
+        object_type: {
+            name: {"entries": len(object_entries), "fingerprint": _fingerprint(object_entries)}
+            for name, object_entries in objects.items()
+        }
+        for object_type, objects in _get_parsed_config(config)[0].items()
+    }
+
+
+def list_changed_fingerprints(reference_fingerprints, candidate_changes):
+    """List all objects of candidate changes which differ from the reference fingerprints.
+
+    Same as list_changed_objects, with the fingerprints of the reference config instead of the
+    config itself.
+    """
+    entries, lines = _get_parsed_config(candidate_changes)
+    reference_lines = set(reference_fingerprints.get("lines", []))
+
+    detected_diff = defaultdict(list)
+    for section, objects in entries.items():
+        for name, object_entries in objects.items():
+            if _fingerprint(object_entries) != reference_fingerprints.get(section, {}).get(name):
+                detected_diff[section].append(name)
+
+    for path in lines:
+        if _fingerprint_path(path) not in reference_lines:
+            detected_diff["lines"].append(_format_path(path))
+
+    return dict(detected_diff)
@@ -0,0 +1 @@
+"""Unit tests for SONiC beacons."""
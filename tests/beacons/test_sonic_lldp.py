@@ -0,0 +1,99 @@
+"""Unit tests for sonic lldp beacon."""
+
+import json
+
+import _beacons.sonic_lldp as BEACON
+
+ROUTER = {
+    "chassis": {"sonic.spine": {"id": {"value": "90:10:00:01:02:03"}}},
+    "port": {"id": {"value": "Ethernet0"}},
+}
+SERVER = {"chassis": {"id": {"value": "00:53:00:01:02:03"}}, "port": {"id": {"value": "eth0"}}}
+
+
+def _patch_beacon(mocker, tmp_path):
+    mocker.patch.object(BEACON, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+    mocker.patch.object(BEACON, "__context__", {}, create=True)
+
+
+def _read_cache(tmp_path):
+    with open(tmp_path / BEACON.LLDP_CACHE_FILENAME, encoding="utf-8") as fd:
+        return json.load(fd)["interface"]
+
+
+def test__decode_events__partial():
+    """Test a partial JSON object is kept for next reads."""
+    first = json.dumps({"lldp-added": {"interface": {"Ethernet0": SERVER}}})
+    second = json.dumps({"lldp-deleted": {"interface": {"Ethernet0": SERVER}}})
+
+    events, remaining = BEACON._decode_events(first + "\n\n" + second[:10])
+    assert events == [json.loads(first)]
+    assert remaining == second[:10]
+
+    events, remaining = BEACON._decode_events(remaining + second[10:] + "\n")
+    assert events == [json.loads(second)]
+    assert remaining == ""
+
+
+def test__apply_event():
+    """Test neighbors are added, updated and removed per chassis/port."""
+    neighbors = {}
+    updated = dict(SERVER, age="0 day, 00:01:00")
+
+    assert BEACON._apply_event(neighbors, "added", "Ethernet4", SERVER)
+    assert BEACON._apply_event(neighbors, "updated", "Ethernet4", updated)
+    assert neighbors == {"Ethernet4": [updated]}
+    assert not BEACON._apply_event(neighbors, "removed", "Ethernet4", ROUTER)
+    assert BEACON._apply_event(neighbors, "removed", "Ethernet4", SERVER)
+    assert not neighbors
+
+
+def test__diff_neighbors():
+    """Test events fired when the watcher is restarted."""
+    old = {"Ethernet0": [ROUTER], "Ethernet4": [SERVER]}
+    new = {"Ethernet0": [dict(ROUTER, age="1")], "Ethernet8": [SERVER]}
+
+    assert BEACON._diff_neighbors(old, new) == [
+        {"tag": "updated", "interface": "Ethernet0", "neighbor": dict(ROUTER, age="1")},
+        {"tag": "removed", "interface": "Ethernet4", "neighbor": SERVER},
+        {"tag": "added", "interface": "Ethernet8", "neighbor": SERVER},
+    ]
+
+
+def test_beacon(mocker, tmp_path):
+    """Test the beacon reads the neighbors at start, then follows the watcher."""
+    _patch_beacon(mocker, tmp_path)
+    watcher = mocker.Mock()
+    watcher.poll.return_value = None
+    mocker.patch("_beacons.sonic_lldp._start_watch", return_value=watcher)
+    mocker.patch("_beacons.sonic_lldp._read_neighbors", return_value={"Ethernet0": [ROUTER]})
+    read_watch = mocker.patch("_beacons.sonic_lldp._read_watch", return_value="")
+
+    assert BEACON.beacon([]) == []
+    assert _read_cache(tmp_path) == [{"Ethernet0": ROUTER}]
+    assert BEACON.beacon([]) == []
+
+    read_watch.return_value = json.dumps({"lldp-added": {"interface": {"Ethernet4": SERVER}}})
+    assert BEACON.beacon([]) == [{"tag": "added", "interface": "Ethernet4", "neighbor": SERVER}]
+    assert _read_cache(tmp_path) == [{"Ethernet0": ROUTER}, {"Ethernet4": SERVER}]
+
+
+def test_beacon__watcher_restart(mocker, tmp_path):
+    """Test changes missed while the watcher was stopped are fired at restart."""
+    _patch_beacon(mocker, tmp_path)
+    watcher = mocker.Mock()
+    watcher.poll.return_value = 1
+    BEACON.__context__.update(
+        {"sonic_lldp.watcher": watcher, "sonic_lldp.neighbors": {"Ethernet0": [ROUTER]}}
+    )
+    mocker.patch("_beacons.sonic_lldp._start_watch", return_value=mocker.Mock())
+    mocker.patch("_beacons.sonic_lldp._read_neighbors", return_value={})
+
+    assert BEACON.beacon([]) == [{"tag": "removed", "interface": "Ethernet0", "neighbor": ROUTER}]
+    assert _read_cache(tmp_path) == []
+
+
+def test_validate():
+    """Test the beacon configuration must be a list."""
+    assert BEACON.validate([{"interval": 10}])[0]
+    assert not BEACON.validate({"interval": 10})[0]
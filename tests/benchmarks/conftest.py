@@ -0,0 +1,113 @@
+"""Benchmarks of the parsers and diff utilities.
+
+Run them with:
+
+.. code-block:: bash
+
+    pytest tests/benchmarks --benchmark-only --benchmark-autosave
+
+Each benchmark reports its time (pytest-benchmark) and the peak memory of one call, in
+extra_info. Time regressions are flagged against a previous run saved by pytest-benchmark
+(ex: --benchmark-compare --benchmark-compare-fail=mean:20%), as they depend on the machine.
+Peak memory is compared to the baselines stored in baselines.json, a benchmark fails if it
+exceeds its baseline by more than MEMORY_TOLERANCE. Baselines are updated with
+BENCHMARK_UPDATE_BASELINES=1.
+
+With --benchmark-disable (as in tox), benchmarks are a smoke test: the ones marked large are
+skipped, others run once and their peak memory is not checked, unless BENCHMARK_CHECK_MEMORY=1.
+"""
+
+import json
+import os
+import tracemalloc
+
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401 pylint: disable=unused-import
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+MEMORY_TOLERANCE = 0.25
+ROUNDS = 5
+
+_BASELINES = pytest.StashKey()
+_MEASURED = pytest.StashKey()
+
+
+def _load_baselines():
+    try:
+        with open(BASELINES_FILE, encoding="utf-8") as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return {}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "large: benchmark skipped when benchmarks are disabled")
+    config.stash[_BASELINES] = _load_baselines()
+    config.stash[_MEASURED] = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("benchmark_disable", False):
+        return
+
+    skip_large = pytest.mark.skip(reason="large benchmark, benchmarks are disabled")
+    for item in items:
+        if item.get_closest_marker("large"):
+            item.add_marker(skip_large)
+
+
+def pytest_unconfigure(config):
+    if _MEASURED not in config.stash or not config.stash[_MEASURED]:
+        return
+    if os.environ.get("BENCHMARK_UPDATE_BASELINES") != "1":
+        return
+
+    baselines = dict(config.stash[_BASELINES], **config.stash[_MEASURED])
+    with open(BASELINES_FILE, "w", encoding="utf-8") as fd:
+        json.dump(dict(sorted(baselines.items())), fd, indent=4)
+        fd.write("\n")
+
+
+def _peak_memory(func, args):
+    """Get the peak memory (KiB) allocated by one call."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak // 1024
+
+
+@pytest.fixture
+def measure(request, benchmark):
+    """Benchmark a function, and check its peak memory against the baseline.
+
+    setup returns the arguments of each call, so that inputs modified by a call are not reused.
+    """
+
+    def _measure(func, setup):
+        result = benchmark.pedantic(func, setup=lambda: (setup(), {}), rounds=ROUNDS)
+        if benchmark.disabled and os.environ.get("BENCHMARK_CHECK_MEMORY") != "1":
+            return result
+
+        name = request.node.name
+        peak = _peak_memory(func, setup())
+        benchmark.extra_info["peak_memory_kib"] = peak
+        request.config.stash[_MEASURED][name] = peak
+
+        baseline = request.config.stash[_BASELINES].get(name)
+        if baseline is not None and peak > baseline * (1 + MEMORY_TOLERANCE):
+            pytest.fail(
+                "peak memory regression: {} KiB, baseline {} KiB".format(peak, baseline),
+                pytrace=False,
+            )
+
+        return result
+
+    return _measure
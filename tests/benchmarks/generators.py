@@ -0,0 +1,237 @@
+"""Synthetic data generators for the benchmarks.
+
+Outputs are deterministic for a given size, so that memory baselines can be compared.
+"""
+
+import ipaddress
+import json
+
+
+def _neighbor_ip(index):
+    return str(ipaddress.IPv4Address("10.0.0.0") + 2 * index + 1)
+
+
+def _mac(index):
+    return ":".join("{:02X}".format(byte) for byte in b"\x00\x53" + index.to_bytes(4, "big"))
+
+
+def frr_config(lines):
+    """Get a running FRR config of about the number of lines given.
+
+    A third of the lines are neighbors (in router bgp and in its address-family), the rest are
+    route-maps, prefix-lists and community-lists.
+    """
+    nb_neighbors = lines // 9
+    nb_policies = (lines - 9 * nb_neighbors // 3) // 8 + 1
+
+    config = [
+        "frr version 7.5.1-sonic",
+        "frr defaults traditional",
+        "hostname sonic.tor",
+        "log syslog informational",
+        "!",
+    ]
+
+    for index in range(nb_policies):
+        config += [
+            "ip prefix-list PF-{} seq 5 permit 10.{}.{}.0/24".format(
+                index, index // 256 % 256, index % 256
+            ),
+            "ip prefix-list PF-{} seq 10 deny any".format(index),
+            "bgp community-list standard CL-{} seq 5 permit 65000:{}".format(index, index),
+            "route-map RM-{} permit 10".format(index),
+            " match ip address prefix-list PF-{}".format(index),
+            " set local-preference {}".format(100 + index % 100),
+            "route-map RM-{} deny 20".format(index),
+            "!",
+        ]
+
+    config.append("router bgp 65000")
+    for index in range(nb_neighbors // 3):
+        neighbor = _neighbor_ip(index)
+        config += [
+            " neighbor {} remote-as {}".format(neighbor, 65001 + index),
+            " neighbor {} description server{}".format(neighbor, index),
+            " neighbor {} timers 3 9".format(neighbor),
+        ]
+    config.append(" !")
+    config.append(" address-family ipv4 unicast")
+    for index in range(nb_neighbors // 3):
+        neighbor = _neighbor_ip(index)
+        config += [
+            "  neighbor {} route-map RM-{} in".format(neighbor, index % nb_policies),
+            "  neighbor {} route-map RM-{} out".format(neighbor, (index + 1) % nb_policies),
+            "  neighbor {} soft-reconfiguration inbound".format(neighbor),
+            "  neighbor {} activate".format(neighbor),
+            "  neighbor {} maximum-prefix 10000".format(neighbor),
+            "  neighbor {} send-community".format(neighbor),
+        ]
+    config += [" exit-address-family", "!", "line vty", "!", "end"]
+
+    return "\n".join(config)
+
+
+def frr_candidate(config, changes=10):
+    """Get the policy objects of a FRR config, with a few local-preference changed."""
+    candidate = []
+    changed = 0
+    for line in config.split("\n"):
+        if line.startswith("router bgp"):
+            break
+        if line.startswith(" set local-preference") and changed < changes:
+            line = " set local-preference 50"
+            changed += 1
+        candidate.append(line)
+
+    return "\n".join(candidate)
+
+
+def config_db(ports):
+    """Get a config_db with the number of ports given, in VLANs of 48 ports."""
+    data = {
+        "DEVICE_METADATA": {"localhost": {"hostname": "sonic.tor", "hwsku": "some-hardware"}},
+        "PORT": {},
+        "INTERFACE": {},
+        "VLAN": {},
+        "VLAN_MEMBER": {},
+    }
+
+    for index in range(ports):
+        port = "Ethernet{}".format(4 * index)
+        vlan = "Vlan{}".format(1000 + index // 48)
+        data["PORT"][port] = {
+            "admin_status": "up",
+            "alias": "etp{}".format(index + 1),
+            "description": "server{}:eth0".format(index),
+            "index": str(index),
+            "lanes": ",".join(str(4 * index + lane) for lane in range(4)),
+            "mtu": "9100",
+            "speed": "100000",
+        }
+        data["VLAN"].setdefault(vlan, {"vlanid": vlan[4:]})
+        data["VLAN_MEMBER"]["{}|{}".format(vlan, port)] = {"tagging_mode": "untagged"}
+        if index % 8 == 0:
+            data["INTERFACE"]["{}|10.{}.{}.0/31".format(port, index // 256, index % 256)] = {}
+
+    return data
+
+
+def fdb_entries(entries):
+    """Get the entries of criteo_fdbshow JSON output."""
+    return [
+        {
+            "No.": index + 1,
+            "Vlan": 1000 + index % 64,
+            "MacAddress": _mac(index),
+            "Port": "Ethernet{}".format(4 * (index % 128)),
+            "Type": "Dynamic" if index % 16 else "Static",
+        }
+        for index in range(entries)
+    ]
+
+
+def bgp_neighbors(neighbors):
+    """Get "show bgp vrf all neighbors json" output, neighbors are spread over 4 VRFs."""
+    vrfs = {}
+    for index in range(neighbors):
+        vrf = "default" if index % 4 == 0 else "Vrf{}".format(index % 4)
+        vrf_data = vrfs.setdefault(vrf, {"vrfId": index % 4, "vrfName": vrf})
+        vrf_data[_neighbor_ip(index)] = {
+            "remoteAs": 65001 + index,
+            "localAs": 65000,
+            "nbrExternalLink": True,
+            "nbrDesc": "server{}".format(index),
+            "peerGroup": "PG-SERVERS",
+            "bgpVersion": 4,
+            "bgpState": "Established" if index % 10 else "Active",
+            "bgpTimerUpMsec": 7255505000,
+            "messageStats": {"updatesSent": 34838, "updatesRecv": 40840, "totalSent": 330633},
+            "addressFamilyInfo": {
+                "ipv4Unicast": {
+                    "peerGroupMember": "PG-SERVERS",
+                    "routeMapForIncomingAdvertisements": "RM-IN",
+                    "routeMapForOutgoingAdvertisements": "RM-OUT",
+                    "acceptedPrefixCounter": index % 100,
+                    "sentPrefixCounter": 3253,
+                }
+            },
+            "hostLocal": "10.0.0.0",
+            "hostForeign": _neighbor_ip(index),
+        }
+
+    return json.dumps(vrfs)
+
+
+def bgp_summary(neighbors):
+    """Get "show bgp vrf all summary json" output, neighbors are spread over 4 VRFs."""
+    vrfs = {}
+    for index in range(neighbors):
+        vrf = "default" if index % 4 == 0 else "Vrf{}".format(index % 4)
+        family = vrfs.setdefault(vrf, {}).setdefault(
+            "ipv4Unicast", {"as": 65000, "vrfName": vrf, "peerCount": 0, "peers": {}}
+        )
+        family["peerCount"] += 1
+        family["peers"][_neighbor_ip(index)] = {
+            "remoteAs": 65001 + index,
+            "version": 4,
+            "msgRcvd": 239587,
+            "msgSent": 239512,
+            "peerUptimeMsec": 7255505000,
+            "pfxRcd": index % 100,
+            "pfxSnt": 3253,
+            "state": "Established" if index % 10 else "Active",
+            "desc": "server{}".format(index),
+        }
+
+    return json.dumps(vrfs)
+
+
+def lldp_neighbors(interfaces):
+    """Get the interfaces of lldpctl JSON output, with configured and unconfigured neighbors."""
+    entries = []
+    for index in range(interfaces):
+        chassis = {
+            "id": {"type": "mac", "value": _mac(index)},
+            "descr": "some OS with version",
+            "capability": [
+                {"type": "Bridge", "enabled": True},
+                {"type": "Router", "enabled": index % 2 == 0},
+            ],
+        }
+        if index % 2:
+            chassis = {"server{}".format(index): chassis}
+
+        entries.append(
+            {
+                "Ethernet{}".format(4 * index): {
+                    "via": "LLDP",
+                    "chassis": chassis,
+                    "port": {
+                        "id": {"type": "mac", "value": _mac(index)},
+                        "descr": "eth0",
+                    },
+                }
+            }
+        )
+
+    return entries
+
+
+def fan_output(fans):
+    """Get "show platform fan" output."""
+    lines = [
+        "        FAN    Speed    Direction    Presence    Status          Timestamp",
+        "-----------  -------  -----------  ----------  --------  -----------------",
+    ]
+    for index in range(fans):
+        lines.append(
+            "{:>11}  {:>6}%  {:>11}  {:>10}  {:>8}  20230101 00:00:00".format(
+                "fan{}".format(index + 1),
+                40 + index % 60,
+                "intake",
+                "Present",
+                "OK" if index % 7 else "Not OK",
+            )
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,56 @@
+"""Benchmarks of frr_detect_diff."""
+
+import functools
+
+import pytest
+
+import _utils.frr_detect_diff as UTIL_MOD
+from tests.benchmarks import generators
+
+FRR_LINES = [
+    10_000,
+    pytest.param(100_000, marks=pytest.mark.large),
+    pytest.param(500_000, marks=pytest.mark.large),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def _frr_config(lines):
+    return generators.frr_config(lines)
+
+
+def _uncached(*args):
+    """Get a setup clearing the cache of parsed configs, to benchmark the parsing."""
+
+    def setup():
+        UTIL_MOD._PARSED_CONFIGS.clear()
+        return args
+
+    return setup
+
+
+@pytest.mark.parametrize("lines", FRR_LINES)
+def test_get_objects(measure, lines):
+    """Benchmark get_objects on a running config."""
+    objects = measure(UTIL_MOD.get_objects, _uncached(_frr_config(lines)))
+
+    assert objects["route_maps"]
+
+
+@pytest.mark.parametrize("lines", FRR_LINES)
+def test_get_delta_config(measure, lines):
+    """Benchmark get_delta_config of a candidate with all the policies of a running config."""
+    config = _frr_config(lines)
+    candidate = generators.frr_candidate(config)
+
+    delta = measure(UTIL_MOD.get_delta_config, _uncached(config, candidate))
+
+    assert delta.count("set local-preference 50") == 10
+
+
+@pytest.mark.parametrize("lines", FRR_LINES)
+def test_get_fingerprints(measure, lines):
+    """Benchmark get_fingerprints on a running config."""
+    fingerprints = measure(UTIL_MOD.get_fingerprints, _uncached(_frr_config(lines)))
+
+    assert fingerprints["lines"]
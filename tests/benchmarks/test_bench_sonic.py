@@ -0,0 +1,95 @@
+"""Benchmarks of sonic execution module parsers."""
+
+import functools
+import json
+
+import pytest
+
+import _modules.sonic as EXEC_MOD
+from _utils.naming import normalize_plural
+from tests.benchmarks import generators
+
+
+@functools.lru_cache(maxsize=None)
+def _frr_config(lines):
+    return generators.frr_config(lines)
+
+
+def _call_normalize(command, *args, **kwargs):  # pylint: disable=W0613
+    return normalize_plural(*args)
+
+
+@pytest.mark.parametrize("lines", [10_000, pytest.param(100_000, marks=pytest.mark.large)])
+def test__diff__frr_config(measure, lines):
+    """Benchmark _diff of a running FRR config before and after a push."""
+    before = _frr_config(lines)
+    after = before.replace("set local-preference 100\n", "set local-preference 50\n")
+
+    diff = measure(EXEC_MOD._diff, lambda: (before, after))
+
+    assert "+ set local-preference 50" in diff
+
+
+@pytest.mark.parametrize("ports", [512, pytest.param(4096, marks=pytest.mark.large)])
+def test__diff__configdb(measure, ports):
+    """Benchmark _diff of a config_db file before and after a push."""
+    data = generators.config_db(ports)
+    before = json.dumps(data, indent=4, sort_keys=True)
+    data["PORT"]["Ethernet0"]["mtu"] = "1500"
+    after = json.dumps(data, indent=4, sort_keys=True)
+
+    diff = measure(EXEC_MOD._diff, lambda: (before, after))
+
+    assert '+            "mtu": "1500",' in diff
+
+
+@pytest.mark.parametrize("interfaces", [64, pytest.param(4096, marks=pytest.mark.large)])
+def test__convert_lldp_napalm_fmt(mocker, measure, interfaces):
+    """Benchmark _convert_lldp_napalm_fmt."""
+    mocker.patch("_modules.sonic._utils_call", side_effect=_call_normalize)
+    lldp_info = generators.lldp_neighbors(interfaces)
+
+    result = measure(EXEC_MOD._convert_lldp_napalm_fmt, lambda: (lldp_info,))
+
+    assert len(result["out"]) == interfaces
+
+
+@pytest.mark.parametrize("fans", [16, pytest.param(10_000, marks=pytest.mark.large)])
+def test_fan_status(mocker, measure, fans):
+    """Benchmark fan_status parsing."""
+    output = generators.fan_output(fans)
+    mocker.patch.object(
+        EXEC_MOD, "__salt__", {"cmd.run": mocker.MagicMock(return_value=output)}, create=True
+    )
+
+    result = measure(EXEC_MOD.fan_status, lambda: ())
+
+    assert len(result) == fans
+
+
+@pytest.mark.parametrize("entries", [10_000, pytest.param(100_000, marks=pytest.mark.large)])
+def test__sort_fdb_entries(measure, entries):
+    """Benchmark _sort_fdb_entries and _convert_mac_napalm_fmt on a criteo_fdbshow output."""
+    fdb = json.dumps(generators.fdb_entries(entries)[::-1])
+
+    def sort_and_convert(data):
+        return EXEC_MOD._convert_mac_napalm_fmt(EXEC_MOD._sort_fdb_entries(json.loads(data)))
+
+    result = measure(sort_and_convert, lambda: (fdb,))
+
+    assert len(result) == entries
+
+
+@pytest.mark.parametrize("neighbors", [128, pytest.param(1024, marks=pytest.mark.large)])
+@pytest.mark.parametrize("summary", [False, True])
+def test__get_bgp_neighbors_all_vrfs(mocker, measure, neighbors, summary):
+    """Benchmark loading and extracting the BGP neighbors of all VRFs."""
+    outputs = {
+        "neighbors": generators.bgp_neighbors(neighbors),
+        "summary": generators.bgp_summary(neighbors),
+    }
+    mocker.patch("_modules.sonic._get_bgp_all_vrfs", side_effect=outputs.get)
+
+    result = measure(EXEC_MOD._get_bgp_neighbors_all_vrfs, lambda: (None, summary, None))
+
+    assert sum(len(vrf_result) for vrf_result in result.values()) == neighbors
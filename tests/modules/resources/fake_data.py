@@ -37,3 +37,14 @@ interfaces = {
         "up": True,
     },
 }
+
+ip_addr_show = """\
+1: lo    inet 127.0.0.1/16 scope host lo\\       valid_lft forever preferred_lft forever
+1: lo    inet6 ::1/128 scope host \\       valid_lft forever preferred_lft forever
+8: Ethernet0    inet 198.51.100.65/31 scope global Ethernet0\\       valid_lft forever preferred_lft forever
+12: Ethernet16    inet6 2001:db8:1234:4567:abc:0:1:101/127 scope global \\       valid_lft forever preferred_lft forever
+12: Ethernet16    inet6 2001:db8::d6dc/64 scope link \\       valid_lft forever preferred_lft forever
+17: Ethernet36    inet 192.0.2.129/31 scope global Ethernet36\\       valid_lft forever preferred_lft forever
+17: Ethernet36    inet6 2001:db8:1234:5654:1234:0:1:101/127 scope global \\       valid_lft forever preferred_lft forever
+17: Ethernet36    inet6 2001:db8::d6dc/64 scope link \\       valid_lft forever preferred_lft forever
+"""
@@ -5,6 +5,8 @@ import pytest
 
 from salt import exceptions
 
+import _modules.sonic as EXEC_MOD
+import _utils.frr_detect_diff as UTIL_MOD
 from _modules.sonic import _extract_bgp_neighbor_info, get_bgp_neighbors
 
 RES_DIR = "tests/modules/resources"
@@ -121,5 +123,511 @@ def test_get_bgp_neighbors__present__not_found(mocker):
         "_modules.sonic._get_bgp_neighbor", return_value='{"bgpNoSuchNeighbor":true}'
     )
 
-    with pytest.raises(exceptions.CommandExecutionError):
+    with pytest.raises(exceptions.CommandExecutionError, match="198.51.100.0"):
         get_bgp_neighbors("198.51.100.0")
+
+
+def test_get_bgp_neighbors__summary(mocker):
+    """Test get_bgp_neighbors from the BGP summary only."""
+    with open(f"{RES_DIR}/bgp_summary_frr_7.2.json") as resource:
+        fake_summary = resource.read()
+
+    mocker.patch("_modules.sonic._get_bgp_summary", return_value=fake_summary)
+    detail = mocker.patch("_modules.sonic._get_bgp_neighbor")
+
+    assert get_bgp_neighbors(summary=True)["203.0.113.11"] == {
+        "remote_as": 65511,
+        "local_as": 65197,
+        "remote_address": "203.0.113.11",
+        "peer_group": None,
+        "import_policy": None,
+        "export_policy": None,
+        "description": None,
+        "state": "down",
+        "vrf": "default",
+        "address_family": {"ipv4Unicast": {"received_prefixes": 0, "sent_prefixes": None}},
+    }
+    detail.assert_not_called()
+
+
+def test_get_bgp_neighbors__summary_policies(mocker):
+    """Test get_bgp_neighbors from the BGP summary with the policies of one neighbor."""
+    with open(f"{RES_DIR}/bgp_summary_frr_7.2.json") as resource:
+        fake_summary = resource.read()
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.2.json") as resource:
+        fake_neighbor = resource.read()
+
+    mocker.patch("_modules.sonic._get_bgp_summary", return_value=fake_summary)
+    detail = mocker.patch("_modules.sonic._get_bgp_neighbor", return_value=fake_neighbor)
+
+    assert get_bgp_neighbors("203.0.113.9", summary=True, policies="203.0.113.9") == {
+        "203.0.113.9": {
+            "remote_as": 65509,
+            "local_as": 65197,
+            "remote_address": "203.0.113.9",
+            "peer_group": "PEER-GROUP-SPINE",
+            "import_policy": "FABRIC-IN",
+            "export_policy": "FABRIC-OUT",
+            "description": "PEER-GROUP-SPINE:spine9.test",
+            "state": "up",
+            "vrf": "default",
+            "address_family": {"ipv4Unicast": {"received_prefixes": 305, "sent_prefixes": None}},
+        }
+    }
+    detail.assert_called_once_with("203.0.113.9")
+
+
+def test_get_bgp_neighbors__summary_not_found(mocker):
+    """Test get_bgp_neighbors from the BGP summary when neighbor not found."""
+    with open(f"{RES_DIR}/bgp_summary_frr_7.2.json") as resource:
+        fake_summary = resource.read()
+    mocker.patch("_modules.sonic._get_bgp_summary", return_value=fake_summary)
+
+    with pytest.raises(exceptions.CommandExecutionError, match="198.51.100.0"):
+        get_bgp_neighbors("198.51.100.0", summary=True)
+
+
+def test_get_bgp_neighbors__several(mocker):
+    """Test get_bgp_neighbors for several neighbors with a single vtysh call."""
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.0.json") as resource:
+        fake_neighbor_7_0 = resource.read()
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.2.json") as resource:
+        fake_neighbor_7_2 = resource.read()
+
+    batch = mocker.patch(
+        "_modules.sonic._get_bgp_neighbors_batch",
+        return_value=fake_neighbor_7_0 + "\n" + fake_neighbor_7_2,
+    )
+
+    result = get_bgp_neighbors(neighbors=["198.51.100.0", "203.0.113.9"])
+    assert sorted(result) == ["198.51.100.0", "203.0.113.9"]
+    assert result["203.0.113.9"]["export_policy"] == "FABRIC-OUT"
+    batch.assert_called_once_with(["198.51.100.0", "203.0.113.9"])
+
+
+def test_get_bgp_neighbors__several_not_found(mocker):
+    """Test get_bgp_neighbors names the neighbors not found."""
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.0.json") as resource:
+        fake_neighbor = resource.read()
+
+    mocker.patch(
+        "_modules.sonic._get_bgp_neighbors_batch",
+        return_value='{"bgpNoSuchNeighbor":true}\n' + fake_neighbor + '{"bgpNoSuchNeighbor":true}',
+    )
+
+    with pytest.raises(
+        exceptions.CommandExecutionError, match="No BGP session with 192.0.2.1, 192.0.2.3"
+    ):
+        get_bgp_neighbors("192.0.2.1", neighbors="198.51.100.0,192.0.2.3")
+
+
+def test__get_bgp_neighbors_batch(mocker):
+    """Test neighbors are queried with one vtysh command per neighbor."""
+    run = mocker.Mock(return_value="")
+    mocker.patch.object(EXEC_MOD, "__salt__", {"cmd.run": run}, create=True)
+
+    EXEC_MOD._get_bgp_neighbors_batch(["192.0.2.1", "192.0.2.3"])
+    run.assert_called_once_with(
+        "vtysh -c 'show bgp neighbor 192.0.2.1 json' -c 'show bgp neighbor 192.0.2.3 json'"
+    )
+
+
+def _all_vrfs_neighbors():
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.2.json") as resource:
+        default = json.load(resource)
+    with open(f"{RES_DIR}/bgp_neighbor_frr_7.0.json") as resource:
+        tenant = json.load(resource)
+
+    default.update({"vrfId": 0, "vrfName": "default"})
+    tenant.update({"vrfId": 5, "vrfName": "Vrf-TENANT"})
+    return {"default": default, "Vrf-TENANT": tenant}
+
+
+def test_get_bgp_neighbors__all_vrfs(mocker):
+    """Test get_bgp_neighbors for all VRFs with a single vtysh call."""
+    all_vrfs = mocker.patch(
+        "_modules.sonic._get_bgp_all_vrfs", return_value=json.dumps(_all_vrfs_neighbors())
+    )
+
+    result = get_bgp_neighbors(all_vrfs=True)
+    assert sorted(result) == ["Vrf-TENANT", "default"]
+    assert list(result["Vrf-TENANT"]) == ["198.51.100.0"]
+    assert result["Vrf-TENANT"]["198.51.100.0"]["vrf"] == "Vrf-TENANT"
+    assert result["default"]["203.0.113.9"]["vrf"] == "default"
+    all_vrfs.assert_called_once_with("neighbors")
+
+
+def test_get_bgp_neighbors__all_vrfs_summary(mocker):
+    """Test get_bgp_neighbors for all VRFs from the BGP summary, with policies."""
+    with open(f"{RES_DIR}/bgp_summary_frr_7.2.json") as resource:
+        default = json.load(resource)
+    tenant = {
+        "ipv4Unicast": {
+            "as": 65000,
+            "vrfName": "Vrf-TENANT",
+            "peers": {"198.51.100.0": {"remoteAs": 65500, "state": "Established", "pfxRcd": 1}},
+        }
+    }
+    outputs = {
+        "summary": json.dumps({"default": default, "Vrf-TENANT": tenant}),
+        "neighbors": json.dumps(_all_vrfs_neighbors()),
+    }
+    mocker.patch("_modules.sonic._get_bgp_all_vrfs", side_effect=outputs.get)
+
+    result = get_bgp_neighbors(
+        neighbors="198.51.100.0,203.0.113.11", summary=True, all_vrfs=True, policies=True
+    )
+    assert result["Vrf-TENANT"]["198.51.100.0"]["vrf"] == "Vrf-TENANT"
+    assert result["Vrf-TENANT"]["198.51.100.0"]["import_policy"] == "FABRIC-IN"
+    assert result["default"]["203.0.113.11"]["state"] == "down"
+    assert list(result["default"]) == ["203.0.113.11"]
+
+
+def test_get_bgp_neighbors__all_vrfs_summary_policies(mocker):
+    """Test get_bgp_neighbors for all VRFs reads the details of the requested neighbors only."""
+    tenant = {
+        "ipv4Unicast": {
+            "as": 65000,
+            "vrfName": "Vrf-TENANT",
+            "peers": {"198.51.100.0": {"remoteAs": 65500, "state": "Established", "pfxRcd": 1}},
+        }
+    }
+    all_vrfs = mocker.patch(
+        "_modules.sonic._get_bgp_all_vrfs", return_value=json.dumps({"Vrf-TENANT": tenant})
+    )
+    details = {"198.51.100.0": _all_vrfs_neighbors()["Vrf-TENANT"]["198.51.100.0"]}
+    batch = mocker.patch(
+        "_modules.sonic._get_bgp_neighbors_batch", return_value=json.dumps(details)
+    )
+
+    result = get_bgp_neighbors(summary=True, all_vrfs=True, policies="198.51.100.0")
+    assert result["Vrf-TENANT"]["198.51.100.0"]["import_policy"] == "FABRIC-IN"
+    all_vrfs.assert_called_once_with("summary")
+    batch.assert_called_once_with(("198.51.100.0",), ("Vrf-TENANT",))
+
+
+def test__get_bgp_neighbors_batch__vrfs(mocker):
+    """Test neighbors of VRFs are queried with one vtysh command per neighbor."""
+    run = mocker.Mock(return_value="")
+    mocker.patch.object(EXEC_MOD, "__salt__", {"cmd.run": run}, create=True)
+
+    EXEC_MOD._get_bgp_neighbors_batch(["192.0.2.1"], ["Vrf-TENANT"])
+    run.assert_called_once_with("vtysh -c 'show bgp vrf Vrf-TENANT neighbors 192.0.2.1 json'")
+
+
+def test_get_bgp_neighbors__all_vrfs_not_found(mocker):
+    """Test get_bgp_neighbors for all VRFs when a neighbor is in none of them."""
+    mocker.patch(
+        "_modules.sonic._get_bgp_all_vrfs", return_value=json.dumps(_all_vrfs_neighbors())
+    )
+
+    with pytest.raises(exceptions.CommandExecutionError, match="192.0.2.1"):
+        get_bgp_neighbors("192.0.2.1", all_vrfs=True)
+
+
+def _mock_bgp_config(mocker, tmp_path, running_config, rendered):
+    """Mock what bgp_config calls, return the mocks of file.write, cmd.run and get_bgp_config."""
+    file_write = mocker.MagicMock()
+    cmd_run = mocker.MagicMock(return_value="")
+    salt_mock = {
+        "cp.get_file_str": mocker.MagicMock(return_value=rendered),
+        "file.apply_template_on_contents": mocker.MagicMock(return_value=rendered),
+        "file.mkdir": mocker.MagicMock(),
+        "file.write": file_write,
+        "file.remove": mocker.MagicMock(),
+        "cmd.run": cmd_run,
+    }
+    utils_mock = {
+        "frr_detect_diff.{}".format(name): getattr(UTIL_MOD, name)
+        for name in ["get_delta_config", "get_fingerprints", "list_changed_fingerprints"]
+    }
+    mocker.patch.object(EXEC_MOD, "__salt__", salt_mock, create=True)
+    mocker.patch.object(EXEC_MOD, "__utils__", utils_mock, create=True)
+    mocker.patch.object(EXEC_MOD, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+    mocker.patch.object(EXEC_MOD, "__context__", {"retcode": 0}, create=True)
+    mocker.patch("_modules.sonic._get_frr_file_mtime", return_value=1700000000.0)
+    # the running config is saved
+    startup_file = tmp_path / "frr.conf"
+    startup_file.write_text(running_config)
+    mocker.patch.object(EXEC_MOD, "FRR_FILE", str(startup_file))
+    get_bgp_config = mocker.patch("_modules.sonic.get_bgp_config", return_value=running_config)
+
+    return file_write, cmd_run, get_bgp_config
+
+
+def test_bgp_config__delta(mocker, tmp_path):
+    """Test bgp_config pushes the changed objects only."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = (
+        "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0\n"
+        "!\n"
+        "route-map RM-IN permit 10\n"
+        " set local-preference 200\n"
+    )
+    file_write, cmd_run, _ = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2")
+
+    assert ret["result"] is True
+    # the delta is checked, then pushed
+    assert [call.args[1] for call in file_write.call_args_list] == [
+        "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0\n"
+        "!\n"
+        "route-map RM-IN permit 10\n"
+        " no set local-preference 100\n"
+        " set local-preference 200\n"
+        "!\n",
+    ]
+    remote_tmpfile = file_write.call_args.args[0]
+    assert [call.args[0] for call in cmd_run.call_args_list] == [
+        "sudo vtysh --dryrun --inputfile {}".format(remote_tmpfile),
+        "sudo vtysh --inputfile {}".format(remote_tmpfile),
+        "sudo vtysh --writeconfig",
+    ]
+
+
+def test_bgp_config__fingerprints(mocker, tmp_path):
+    """Test bgp_config reads the running config once to detect no changes."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    _, cmd_run, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, running_config)
+
+    for _ in range(3):
+        ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+        assert ret["result"] is True
+        assert ret["changes"] is None
+
+    assert get_bgp_config.call_count == 1
+    # dry runs only
+    assert all("--dryrun" in call.args[0] for call in cmd_run.call_args_list)
+
+
+def test_bgp_config__fingerprints_after_push(mocker, tmp_path):
+    """Test bgp_config updates the fingerprints after a push."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    get_bgp_config.side_effect = [running_config, rendered]
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert ret["changes"]
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert ret["changes"] is None
+    assert get_bgp_config.call_count == 2
+
+
+def test_bgp_config__fingerprints_stale(mocker, tmp_path):
+    """Test bgp_config reads the running config when the startup config was saved since."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, running_config)
+
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    mocker.patch("_modules.sonic._get_frr_file_mtime", return_value=1700000100.0)
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+
+    assert get_bgp_config.call_count == 2
+
+
+def test_bgp_config__fingerprints_refreshed(mocker, tmp_path):
+    """Test bgp_config refreshes stored fingerprints which find changes the config does not have."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, cmd_run, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    EXEC_MOD._save_bgp_fingerprints(running_config)
+    # changed with vtysh and saved since, without changing the startup config mtime
+    get_bgp_config.return_value = rendered
+    (tmp_path / "frr.conf").write_text(rendered)
+
+    for _ in range(3):
+        ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+        assert ret["changes"] is None
+
+    assert get_bgp_config.call_count == 1
+    assert all("--dryrun" in call.args[0] for call in cmd_run.call_args_list)
+
+
+def test_bgp_config__no_changes(mocker, tmp_path):
+    """Test bgp_config pushes nothing, nor saves, if nothing changed."""
+    running_config = (
+        "route-map RM-IN permit 10\n"
+        " set local-preference 100\n"
+        "!\n"
+        "router bgp 65000\n"
+        " neighbor 192.0.2.1 remote-as 65001\n"
+        " address-family ipv4 unicast\n"
+        "  neighbor 192.0.2.1 route-map RM-IN in\n"
+        " exit-address-family\n"
+    )
+    rendered = (
+        "router bgp 65000\n"
+        " address-family ipv4 unicast\n"
+        "  neighbor 192.0.2.1 route-map RM-IN in\n"
+        " exit-address-family\n"
+    )
+    _, cmd_run, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2")
+
+    assert ret["result"] is True
+    assert ret["changes"] is None
+    assert get_bgp_config.call_count == 1
+    assert all("--dryrun" in call.args[0] for call in cmd_run.call_args_list)
+
+
+def test_bgp_config__save_later(mocker, tmp_path):
+    """Test bgp_config without save, the fingerprints stay valid once saved by save_bgp_config."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, cmd_run, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    get_bgp_config.side_effect = [running_config, rendered]
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True, save=False)
+    assert ret["result"] is True
+    assert ret["changes"]
+    assert "sudo vtysh --writeconfig" not in [call.args[0] for call in cmd_run.call_args_list]
+
+    # the startup config is modified by the save
+    mocker.patch("_modules.sonic._get_frr_file_mtime", side_effect=[1700000000.0, 1700000100.0])
+    assert EXEC_MOD.save_bgp_config() is True
+    assert cmd_run.call_args.args[0] == "vtysh --writeconfig"
+
+    mocker.patch("_modules.sonic._get_frr_file_mtime", return_value=1700000100.0)
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert ret["changes"] is None
+    assert get_bgp_config.call_count == 2
+
+
+def test_save_bgp_config__saved_fingerprints(mocker, tmp_path):
+    """Test save_bgp_config does not keep fingerprints valid if they were saved already."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, running_config)
+
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    # manual changes may have been saved
+    mocker.patch("_modules.sonic._get_frr_file_mtime", side_effect=[1700000000.0, 1700000100.0])
+    EXEC_MOD.save_bgp_config()
+
+    mocker.patch("_modules.sonic._get_frr_file_mtime", return_value=1700000100.0)
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert get_bgp_config.call_count == 2
+
+
+def test_get_route_maps(mocker):
+    """Test get_route_maps lists the route-maps of the running config, read once per job."""
+    running_config = (
+        "route-map RM-OUT permit 10\n"
+        " set local-preference 100\n"
+        "route-map RM-IN permit 10\n"
+        "route-map RM-IN deny 20\n"
+        "!\n"
+    )
+    utils_mock = {"frr_detect_diff.get_inventory": UTIL_MOD.get_inventory}
+    mocker.patch.object(EXEC_MOD, "__utils__", utils_mock, create=True)
+    mocker.patch.object(EXEC_MOD, "__context__", {}, create=True)
+    get_bgp_config = mocker.patch("_modules.sonic.get_bgp_config", return_value=running_config)
+
+    assert EXEC_MOD.get_route_maps() == ["RM-IN", "RM-OUT"]
+    assert EXEC_MOD.get_policy_inventory()["route_maps"]["RM-IN"]["entries"] == 2
+    assert get_bgp_config.call_count == 1
+
+
+def test_get_policy_inventory__after_push(mocker, tmp_path):
+    """Test the policy inventory is read again after a push."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-OUT permit 10\n set local-preference 200\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    EXEC_MOD.__utils__["frr_detect_diff.get_inventory"] = UTIL_MOD.get_inventory
+    new_config = running_config + rendered
+    get_bgp_config.side_effect = [running_config, running_config, new_config, new_config]
+
+    assert EXEC_MOD.get_route_maps() == ["RM-IN"]
+    EXEC_MOD.bgp_config("salt://bgp.j2")
+    assert EXEC_MOD.get_route_maps() == ["RM-IN", "RM-OUT"]
+
+
+def test_bgp_config__fingerprints_not_saved(mocker, tmp_path):
+    """Test fingerprints of a push not saved to the startup config are not used."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+    get_bgp_config.side_effect = [running_config, rendered, rendered]
+
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True, save=False)
+    # FRR restarted meanwhile would have lost the push
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+
+    assert ret["changes"] is None
+    assert get_bgp_config.call_count == 3
+
+
+def test_bgp_config__fingerprints_failed_push(mocker, tmp_path):
+    """Test fingerprints of a failed push are not used."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, cmd_run, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+
+    def run(command):
+        failed = "--dryrun" not in command
+        EXEC_MOD.__context__["retcode"] = int(failed)
+        return "% Unknown command" if failed else ""
+
+    cmd_run.side_effect = run
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert ret["result"] is False
+    assert "sudo vtysh --writeconfig" not in [call.args[0] for call in cmd_run.call_args_list]
+
+    # the running config is read again, then pushed again
+    EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+    assert get_bgp_config.call_count == 4
+
+
+def test_bgp_config__fingerprints_running_not_saved(mocker, tmp_path):
+    """Test fingerprints of a running config which is not in the startup config are not used."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    _, _, get_bgp_config = _mock_bgp_config(mocker, tmp_path, running_config, running_config)
+    (tmp_path / "frr.conf").write_text("route-map RM-IN permit 10\n!\n")
+
+    for _ in range(2):
+        ret = EXEC_MOD.bgp_config("salt://bgp.j2", push_only_if_changes=True)
+        assert ret["changes"] is None
+
+    assert get_bgp_config.call_count == 2
+
+
+def test_bgp_config__test(mocker, tmp_path):
+    """Test bgp_config in test mode checks the delta, without pushing it."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    file_write, cmd_run, _ = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+
+    ret = EXEC_MOD.bgp_config("salt://bgp.j2", test=True)
+
+    assert ret["result"] is None
+    delta = (
+        "route-map RM-IN permit 10\n"
+        " no set local-preference 100\n"
+        " set local-preference 200\n"
+        "!\n"
+    )
+    assert [call.args[1] for call in file_write.call_args_list] == [delta]
+    assert ret["comment"] == "- Configuration discarded:\n{}".format(delta)
+    assert [call.args[0] for call in cmd_run.call_args_list] == [
+        "sudo vtysh --dryrun --inputfile {}".format(file_write.call_args.args[0])
+    ]
+
+
+def test_bgp_config__invalid(mocker, tmp_path):
+    """Test bgp_config does not push an invalid delta."""
+    running_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+    rendered = "route-map RM-IN permit 10\n set local-preference 200\n!\n"
+    _, cmd_run, _ = _mock_bgp_config(mocker, tmp_path, running_config, rendered)
+
+    def run(command):
+        EXEC_MOD.__context__["retcode"] = 1
+        return "% Unknown command"
+
+    cmd_run.side_effect = run
+
+    with pytest.raises(exceptions.CommandExecutionError, match="Invalid BGP configuration"):
+        EXEC_MOD.bgp_config("salt://bgp.j2")
+    assert cmd_run.call_count == 1
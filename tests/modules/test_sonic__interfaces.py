@@ -1,30 +1,40 @@
 """Unit tests for sonic interface functions."""
-from tests.modules.resources.fake_data import interfaces
+import json
+import sys
 
-from _modules.sonic import get_ip_addresses
+import pytest
+
+from salt import exceptions
+
+from tests.modules.resources.fake_data import interfaces, ip_addr_show
+
+import _modules.sonic as EXEC_MOD
+from _modules.sonic import get_interfaces, get_ip_addresses
 
 
 def test_get_ip_addresses__no_interfaces(mocker):
     """Test when no interfaces found (unsupported device for example)."""
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=None)
     mocker.patch("_modules.sonic._get_interfaces_brief", return_value=None)
     assert get_ip_addresses("Unknown") == {}
 
 
 def test_get_ip_addresses__no_matching_interfaces(mocker):
     """Test when no interfaces matches."""
-    mocker.patch("_modules.sonic._get_interfaces_brief", return_value=interfaces)
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value="")
     assert get_ip_addresses("Unknown") == {}
 
 
 def test_get_ip_addresses__ipv4_only(mocker):
     """Test when ipv4 only."""
-    mocker.patch("_modules.sonic._get_interfaces_brief", return_value=interfaces)
+    mock = mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=ip_addr_show)
     assert get_ip_addresses("Ethernet0") == {"ipv4": ["198.51.100.65/31"]}
+    mock.assert_called_once_with("Ethernet0")
 
 
 def test_get_ip_addresses__ipv6_only(mocker):
     """Test when ipv6 only."""
-    mocker.patch("_modules.sonic._get_interfaces_brief", return_value=interfaces)
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=ip_addr_show)
     assert get_ip_addresses("Ethernet16") == {
         "ipv6": ["2001:db8:1234:4567:abc:0:1:101/127", "2001:db8::d6dc/64"]
     }
@@ -32,8 +42,631 @@ def test_get_ip_addresses__ipv6_only(mocker):
 
 def test_get_ip_addresses__both_stack(mocker):
     """Test when both ipv4 and ipv6 are available."""
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=ip_addr_show)
+    assert get_ip_addresses("Ethernet36") == {
+        "ipv4": ["192.0.2.129/31"],
+        "ipv6": ["2001:db8:1234:5654:1234:0:1:101/127", "2001:db8::d6dc/64"],
+    }
+
+
+def test_get_ip_addresses__several_interfaces(mocker):
+    """Test addresses of several interfaces are read with a single dump."""
+    mock = mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=ip_addr_show)
+    assert get_ip_addresses(interfaces="Ethernet0,Ethernet36,Unknown") == {
+        "Ethernet0": {"ipv4": ["198.51.100.65/31"]},
+        "Ethernet36": {
+            "ipv4": ["192.0.2.129/31"],
+            "ipv6": ["2001:db8:1234:5654:1234:0:1:101/127", "2001:db8::d6dc/64"],
+        },
+    }
+    mock.assert_called_once_with(None)
+
+
+def test_get_ip_addresses__all(mocker):
+    """Test addresses of all interfaces."""
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=ip_addr_show)
+    assert sorted(get_ip_addresses()) == ["Ethernet0", "Ethernet16", "Ethernet36", "lo"]
+
+
+def test_get_ip_addresses__network_interfaces(mocker):
+    """Test addresses are read from network.interfaces when ip is not usable."""
+    mocker.patch("_modules.sonic._get_ip_addresses_dump", return_value=None)
     mocker.patch("_modules.sonic._get_interfaces_brief", return_value=interfaces)
     assert get_ip_addresses("Ethernet36") == {
         "ipv4": ["192.0.2.129/31"],
         "ipv6": ["2001:db8:1234:5654:1234:0:1:101/127", "2001:db8::d6dc/64"],
     }
+    assert get_ip_addresses(interfaces=["Ethernet0", "Ethernet16"]) == {
+        "Ethernet0": {"ipv4": ["198.51.100.65/31"]},
+        "Ethernet16": {"ipv6": ["2001:db8:1234:4567:abc:0:1:101/127", "2001:db8::d6dc/64"]},
+    }
+
+
+def test__get_ip_addresses_dump(mocker):
+    """Test a single interface dump, and a missing interface."""
+    run_all = mocker.Mock(
+        return_value={"retcode": 1, "stdout": "", "stderr": 'Device "Foo" does not exist.'}
+    )
+    mocker.patch.object(EXEC_MOD, "__salt__", {"cmd.run_all": run_all}, create=True)
+
+    assert EXEC_MOD._get_ip_addresses_dump("Foo") == ""
+    assert run_all.call_args[0][0] == ["ip", "-o", "addr", "show", "dev", "Foo"]
+
+
+def test_get_interfaces__all(mocker):
+    """Test get_interfaces without any selection."""
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    mock = mocker.patch("_modules.sonic._get_interfaces_information", return_value=[])
+    assert get_interfaces() == {}
+    mock.assert_called_once_with([], [])
+
+
+def test_get_interfaces__selection(mocker):
+    """Test get_interfaces with several interfaces and fields."""
+    fake_output = [{"Ethernet0": {"oper_status": "up", "speed": "100G"}}]
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    mock = mocker.patch("_modules.sonic._get_interfaces_information", return_value=fake_output)
+
+    assert get_interfaces(interfaces="Ethernet0,Ethernet4", fields=["oper_status", "speed"]) == {
+        "Ethernet0": {"oper_status": "up", "speed": "100G"}
+    }
+    mock.assert_called_once_with(["Ethernet0", "Ethernet4"], ["oper_status", "speed"])
+
+
+def test_get_interfaces__single_interface(mocker):
+    """Test get_interfaces with the legacy interface parameter."""
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    mock = mocker.patch("_modules.sonic._get_interfaces_information", return_value=[])
+    get_interfaces("Ethernet0", interfaces=["Ethernet4"])
+    mock.assert_called_once_with(["Ethernet0", "Ethernet4"], [])
+
+
+def test_get_interfaces__unknown_interface(mocker):
+    """Test get_interfaces when the script does not output any interface."""
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    mocker.patch("_modules.sonic._get_interfaces_information", return_value=[])
+    assert get_interfaces("Unknown") == {}
+
+
+def test_get_interfaces__in_process(mocker):
+    """Test get_interfaces with the in-process collector."""
+    collector = mocker.Mock()
+    collector.get_intf_information.return_value = {"Ethernet0": {"speed": "100G"}}
+    mocker.patch("_modules.sonic._get_collector", return_value=collector)
+    script = mocker.patch("_modules.sonic._get_interfaces_information")
+
+    assert get_interfaces("Ethernet0", fields="speed") == {"Ethernet0": {"speed": "100G"}}
+    collector.get_intf_information.assert_called_once_with(["Ethernet0"], ["speed"])
+    script.assert_not_called()
+
+
+def test_get_interfaces__in_process_invalid_field(mocker):
+    """Test get_interfaces with the in-process collector and an unknown field."""
+    collector = mocker.Mock()
+    collector.get_intf_information.side_effect = ValueError("Invalid field(s) foo")
+    mocker.patch("_modules.sonic._get_collector", return_value=collector)
+
+    with pytest.raises(exceptions.CommandExecutionError):
+        get_interfaces(fields="foo")
+
+
+def test_get_interfaces__in_process_failure(mocker):
+    """Test get_interfaces falls back to the script when the collector fails."""
+    collector = mocker.Mock()
+    collector.get_intf_information.side_effect = ConnectionError()
+    mocker.patch("_modules.sonic._get_collector", return_value=collector)
+    reset = mocker.patch("_modules.sonic._reset_collector")
+    mocker.patch("_modules.sonic._get_interfaces_information", return_value=[])
+
+    assert get_interfaces() == {}
+    reset.assert_called_once()
+
+
+def test__load_script(mocker):
+    """Test criteo_intf_information can be loaded as a library."""
+    mocker.patch.dict(sys.modules, {"swsssdk": mocker.MagicMock()})
+    script = EXEC_MOD._load_script("states/utilities/202211/criteo_intf_information")
+
+    intf_information = script.IntfInformation()
+    with pytest.raises(ValueError):
+        intf_information.get_intf_information(fields=["foo"])
+
+
+def test_script_main__ndjson_error(mocker, capsys):
+    """Test criteo_intf_information reports errors in JSON with the streamed output."""
+    mocker.patch.dict(sys.modules, {"swsssdk": mocker.MagicMock()})
+    script = EXEC_MOD._load_script("states/utilities/202211/criteo_intf_information")
+    mocker.patch.object(script, "IntfInformation", side_effect=ConnectionError("redis is down"))
+    mocker.patch.object(sys, "argv", ["criteo_intf_information", "-n"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        script.main()
+
+    assert exc_info.value.code == 1
+    assert capsys.readouterr().out == '{"error": "redis is down"}\n'
+
+
+INTF_DATABASES = {
+    "APPL_DB": {
+        "PORT_TABLE:Ethernet0": {
+            "alias": "etp1",
+            "description": "spine1.test",
+            "admin_status": "up",
+            "oper_status": "up",
+            "lanes": "0,1,2,3",
+            "speed": "100000",
+            "mtu": "9100",
+        },
+        "PORT_TABLE:Ethernet4": {
+            "alias": "etp2",
+            "admin_status": "up",
+            "oper_status": "down",
+            "lanes": "4",
+            "speed": "10000",
+            "mtu": "9100",
+        },
+        "PORT_TABLE:Ethernet8": {"alias": "etp3", "admin_status": "down", "lanes": "8,9"},
+        "PORT_TABLE:Ethernet-BP0": {"alias": "bp0", "lanes": "100"},
+    },
+    "STATE_DB": {
+        "TRANSCEIVER_INFO|Ethernet0": {
+            "type": "QSFP28 or later",
+            "modelname": "QSFP28-100G-SR4",
+            "manufacturename": "ACME",
+        },
+        "TRANSCEIVER_DOM_SENSOR|Ethernet0": dict(
+            [("rx{}power".format(i), "-{}.5".format(i)) for i in range(1, 5)]
+            + [("tx{}power".format(i), "-{}.25".format(i)) for i in range(1, 5)]
+            + [("temperature", "30.5")]
+        ),
+        "TRANSCEIVER_INFO|Ethernet8": {"type": "SFP+"},
+        "TRANSCEIVER_DOM_SENSOR|Ethernet8": {"rx1power": "-3.0", "tx2power": "-2.0"},
+    },
+}
+
+
+class _FakePipeline:
+    """Redis pipeline of a fake SONiC database, recording the commands it runs."""
+
+    def __init__(self, db_name, table, commands):
+        self.db_name = db_name
+        self.table = table
+        self.commands = commands
+        self.queued = []
+
+    def exists(self, key):
+        self.queued.append(("EXISTS", key, None))
+
+    def hgetall(self, key):
+        self.queued.append(("HGETALL", key, None))
+
+    def hmget(self, key, fields):
+        self.queued.append(("HMGET", key, list(fields)))
+
+    def execute(self):
+        results = []
+        for command, key, fields in self.queued:
+            self.commands.append((self.db_name, command, key, fields))
+            entry = self.table.get(key)
+            if command == "EXISTS":
+                results.append(int(entry is not None))
+            elif command == "HGETALL":
+                results.append(dict(entry or {}))
+            else:
+                results.append([(entry or {}).get(field) for field in fields])
+
+        return results
+
+
+class _FakeRedisClient:
+    """Redis client of a fake SONiC database."""
+
+    def __init__(self, db_name, table, commands):
+        self.db_name = db_name
+        self.table = table
+        self.commands = commands
+
+    def pipeline(self, transaction=True):  # pylint: disable=unused-argument
+        return _FakePipeline(self.db_name, self.table, self.commands)
+
+
+class _FakeConnector:
+    """SonicV2Connector of fake SONiC databases, one table per database."""
+
+    APPL_DB = "APPL_DB"
+    STATE_DB = "STATE_DB"
+    COUNTERS_DB = "COUNTERS_DB"
+
+    def __init__(self, databases):
+        self.databases = databases
+        self.commands = []
+
+    def connect(self, *_):
+        pass
+
+    def get_redis_client(self, db_name):
+        return _FakeRedisClient(db_name, self.databases[db_name], self.commands)
+
+    def keys(self, db_name, pattern):
+        self.commands.append((db_name, "KEYS", pattern, None))
+        return [key for key in self.databases[db_name] if key.startswith(pattern.rstrip("*"))]
+
+    def get(self, db_name, key, field):
+        return self.databases[db_name].get(key, {}).get(field)
+
+    def get_all(self, db_name, key):
+        self.commands.append((db_name, "HGETALL", key, None))
+        return self.databases[db_name].get(key)
+
+
+def _load_intf_information(mocker, databases, front_panel_ports):
+    """Load criteo_intf_information on fake databases, return the script and the connector."""
+    connector = _FakeConnector(databases)
+    swsssdk = mocker.MagicMock()
+    swsssdk.SonicV2Connector.return_value = connector
+    swsssdk.ConfigDBConnector.return_value.get_keys.return_value = front_panel_ports
+    mocker.patch.dict(sys.modules, {"swsssdk": swsssdk})
+    script = EXEC_MOD._load_script("states/utilities/202211/criteo_intf_information")
+
+    return script, connector
+
+
+def _per_field_intf_information(connector, intf_names, front_panel_ports):
+    """Get the interface information like criteo_intf_information did, one read per field."""
+
+    def get(db_name, key, field):
+        value = connector.get(db_name, key, field)
+        return "N/A" if value is None else value
+
+    if intf_names is None:
+        keys = connector.keys("APPL_DB", "PORT_TABLE:*")
+    else:
+        keys = ["PORT_TABLE:{}".format(name) for name in intf_names if name in front_panel_ports]
+
+    interfaces = {}
+    for key in keys:
+        name = key.split(":", 1)[-1]
+        if name not in front_panel_ports:
+            continue
+
+        speed = get("APPL_DB", key, "speed")
+        lanes = get("APPL_DB", key, "lanes")
+        interfaces[name] = {
+            "alias": get("APPL_DB", key, "alias"),
+            "description": get("APPL_DB", key, "description"),
+            "admin_status": get("APPL_DB", key, "admin_status"),
+            "oper_status": get("APPL_DB", key, "oper_status"),
+            "lanes": lanes,
+            "speed": speed if speed == "N/A" else "{}G".format(speed[:-3]),
+            "mtu": get("APPL_DB", key, "mtu"),
+            "optic_type": get("STATE_DB", "TRANSCEIVER_INFO|" + name, "type"),
+            "optic_model": get("STATE_DB", "TRANSCEIVER_INFO|" + name, "modelname"),
+            "optic_manufacturer": get("STATE_DB", "TRANSCEIVER_INFO|" + name, "manufacturename"),
+        }
+        dom_key = "TRANSCEIVER_DOM_SENSOR|" + name
+        for i in range(1, len(lanes.split(",")) + 1):
+            for power in ("rx", "tx"):
+                field = "{}{}power".format(power, i)
+                interfaces[name]["{}{}_power".format(power, i)] = get("STATE_DB", dom_key, field)
+
+    return interfaces
+
+
+@pytest.mark.parametrize("intf_names", [None, ["Ethernet8"], ["Ethernet0", "Ethernet4"]])
+def test_script_intf_information__default_output(mocker, capsys, intf_names):
+    """Test the default output of criteo_intf_information is the one of the per-field reads."""
+    front_panel_ports = ["Ethernet0", "Ethernet4", "Ethernet8"]
+    script, connector = _load_intf_information(mocker, INTF_DATABASES, front_panel_ports)
+
+    script.IntfInformation().display_intf_information(intf_names)
+
+    expected = _per_field_intf_information(connector, intf_names, front_panel_ports)
+    assert capsys.readouterr().out == "{}\n".format(json.dumps(expected))
+
+
+def test_script_intf_information__no_power_fields(mocker):
+    """Test criteo_intf_information reads only the requested fields, and no optical sensors."""
+    script, connector = _load_intf_information(mocker, INTF_DATABASES, ["Ethernet0", "Ethernet4"])
+
+    interfaces = script.IntfInformation().get_intf_information(fields=["speed", "optic_type"])
+
+    assert interfaces == {
+        "Ethernet0": {"speed": "100G", "optic_type": "QSFP28 or later"},
+        "Ethernet4": {"speed": "10G", "optic_type": "N/A"},
+    }
+    reads = [command for command in connector.commands if command[1] != "KEYS"]
+    assert reads == [
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet0", ["speed"]),
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet4", ["speed"]),
+        ("STATE_DB", "HMGET", "TRANSCEIVER_INFO|Ethernet0", ["type"]),
+        ("STATE_DB", "HMGET", "TRANSCEIVER_INFO|Ethernet4", ["type"]),
+    ]
+
+    # no optic field: STATE_DB is not read
+    connector.commands.clear()
+    script.IntfInformation().get_intf_information(fields=["oper_status"])
+    assert all(command[0] == "APPL_DB" for command in connector.commands)
+
+
+def test_script_intf_information__power_fields(mocker):
+    """Test criteo_intf_information reads the optical power of each lane of the ports."""
+    script, connector = _load_intf_information(mocker, INTF_DATABASES, ["Ethernet0", "Ethernet8"])
+
+    interfaces = script.IntfInformation().get_intf_information(fields=["rx_power"])
+
+    assert interfaces == {
+        "Ethernet0": {
+            "rx1_power": "-1.5",
+            "rx2_power": "-2.5",
+            "rx3_power": "-3.5",
+            "rx4_power": "-4.5",
+        },
+        "Ethernet8": {"rx1_power": "-3.0", "rx2_power": "N/A"},
+    }
+    reads = [command for command in connector.commands if command[1] != "KEYS"]
+    assert reads == [
+        # the lanes are read to know the optical sensors of the port
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet0", ["lanes"]),
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet8", ["lanes"]),
+        (
+            "STATE_DB",
+            "HMGET",
+            "TRANSCEIVER_DOM_SENSOR|Ethernet0",
+            ["rx1power", "rx2power", "rx3power", "rx4power"],
+        ),
+        ("STATE_DB", "HMGET", "TRANSCEIVER_DOM_SENSOR|Ethernet8", ["rx1power", "rx2power"]),
+    ]
+
+
+def test_script_intf_information__interfaces(mocker):
+    """Test criteo_intf_information reads only the requested front panel ports."""
+    front_panel_ports = ["Ethernet0", "Ethernet4", "Ethernet8", "Ethernet12"]
+    script, connector = _load_intf_information(mocker, INTF_DATABASES, front_panel_ports)
+
+    interfaces = script.IntfInformation().get_intf_information(
+        ["Ethernet4", "Ethernet12", "Ethernet-BP0"], ["alias", "optic_model", "tx_power"]
+    )
+
+    assert interfaces == {
+        "Ethernet4": {"alias": "etp2", "optic_model": "N/A", "tx1_power": "N/A"},
+    }
+    assert connector.commands == [
+        # the ports are checked in APPL_DB, without listing its keys
+        ("APPL_DB", "EXISTS", "PORT_TABLE:Ethernet4", None),
+        ("APPL_DB", "EXISTS", "PORT_TABLE:Ethernet12", None),
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet4", ["alias", "lanes"]),
+        ("STATE_DB", "HMGET", "TRANSCEIVER_INFO|Ethernet4", ["modelname"]),
+        ("STATE_DB", "HMGET", "TRANSCEIVER_DOM_SENSOR|Ethernet4", ["tx1power"]),
+    ]
+    assert script.IntfInformation().get_intf_information(["Ethernet-BP0"]) is None
+
+
+def test__get_interfaces_information__command(mocker):
+    """Test the criteo_intf_information command line."""
+    run_ndjson = mocker.patch("_modules.sonic._run_ndjson", return_value=iter([]))
+
+    EXEC_MOD._get_interfaces_information(["Ethernet0", "Ethernet4"], ["optic_type"])
+    run_ndjson.assert_called_once_with(
+        "/opt/salt/scripts/criteo_intf_information -n -f optic_type Ethernet0 Ethernet4"
+    )
+
+
+def test_get_interfaces__streamed(mocker):
+    """Test get_interfaces merges the interfaces streamed by the script."""
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    mocker.patch(
+        "_modules.sonic._get_interfaces_information",
+        return_value=iter([{"Ethernet0": {"speed": "100G"}}, {"Ethernet4": {"speed": "40G"}}]),
+    )
+
+    assert get_interfaces(fields="speed") == {
+        "Ethernet0": {"speed": "100G"},
+        "Ethernet4": {"speed": "40G"},
+    }
+
+
+def _portstat(rx_ok, tx_ok, rx_err="0"):
+    return {"Ethernet0": {"STATE": "U", "RX_OK": rx_ok, "TX_OK": tx_ok, "RX_ERR": rx_err}}
+
+
+def test__read_cache_file(mocker, tmp_path):
+    """Test cache files written atomically, and read back unless they are corrupted."""
+    mocker.patch.object(EXEC_MOD, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+
+    EXEC_MOD._write_cache_file("cache.json", {"Ethernet0": [1, 2]})
+    assert EXEC_MOD._read_cache_file("cache.json") == {"Ethernet0": [1, 2]}
+    assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]
+
+    (tmp_path / "cache.json").write_text('{"Ethernet0": [1,')
+    assert EXEC_MOD._read_cache_file("cache.json") is None
+    assert EXEC_MOD._read_cache_file("missing.json") is None
+
+
+def test__compute_interface_counters_rates(mocker, tmp_path):
+    """Test rates between two snapshots, None on the first call or when unsupported."""
+    mocker.patch.object(EXEC_MOD, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+
+    first = EXEC_MOD._compute_interface_counters_rates(_portstat("1,000", "500"), 100.0)
+    assert first["Ethernet0"]["interval"] is None
+    assert first["Ethernet0"]["rx_pps"] is None
+
+    rates = EXEC_MOD._compute_interface_counters_rates(_portstat("3,000", "1500", "10"), 110.0)
+    assert rates["Ethernet0"]["interval"] == 10.0
+    assert rates["Ethernet0"]["rx_pps"] == 200.0
+    assert rates["Ethernet0"]["tx_pps"] == 100.0
+    assert rates["Ethernet0"]["rx_errors_ps"] == 1.0
+    assert rates["Ethernet0"]["rx_bps"] is None
+    assert rates["Ethernet0"]["tx_discards_ps"] is None
+
+
+def test__counter_delta():
+    """Test counter increase, including wraps and clears."""
+    assert EXEC_MOD._counter_delta(10, 25) == 15
+    assert EXEC_MOD._counter_delta(2**64 - 5, 5) == 10
+    assert EXEC_MOD._counter_delta(1000, 40) == 40
+
+
+def test_get_interface_counters__rates(mocker):
+    """Test get_interface_counters in rate mode for one interface."""
+    mocker.patch("_modules.sonic._get_port_counters", return_value={"Ethernet4": {}})
+    compute = mocker.patch("_modules.sonic._compute_interface_counters_rates", return_value={})
+
+    EXEC_MOD.get_interface_counters("Ethernet4", rates=True)
+    assert compute.call_args[0][0] == {"Ethernet4": {}}
+
+
+def test__get_port_counters__in_process(mocker):
+    """Test port counters are read through the in-process collector."""
+    collector = mocker.Mock()
+    collector.get_counters.return_value = {"Ethernet0": {"RX_OK": "1"}}
+    mocker.patch("_modules.sonic._get_collector", return_value=collector)
+
+    assert EXEC_MOD._get_port_counters(["Ethernet0"]) == {"Ethernet0": {"RX_OK": "1"}}
+    collector.get_counters.assert_called_once_with(["Ethernet0"])
+
+
+def test__get_port_counters__script(mocker):
+    """Test port counters are read through the script when no collector is available."""
+    mocker.patch("_modules.sonic._get_collector", return_value=None)
+    run = mocker.patch(
+        "_modules.sonic._run_ndjson",
+        return_value=iter([{"Ethernet0": {"RX_OK": "1"}}, {"Ethernet4": {"RX_OK": "2"}}]),
+    )
+
+    assert EXEC_MOD._get_port_counters(["Ethernet0", "Ethernet4"]) == {
+        "Ethernet0": {"RX_OK": "1"},
+        "Ethernet4": {"RX_OK": "2"},
+    }
+    run.assert_called_once_with(
+        "/opt/salt/scripts/criteo_intf_information -n -c Ethernet0 Ethernet4"
+    )
+
+
+def _sai_counters(in_ucast, in_non_ucast, **others):
+    """Get the COUNTERS_DB hash of a port, other SAI counters are 0."""
+    counters = {
+        "SAI_PORT_STAT_IF_IN_UCAST_PKTS": str(in_ucast),
+        "SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS": str(in_non_ucast),
+    }
+    for field in [
+        "IF_IN_ERRORS",
+        "IF_IN_DISCARDS",
+        "ETHER_RX_OVERSIZE_PKTS",
+        "IF_OUT_UCAST_PKTS",
+        "IF_OUT_NON_UCAST_PKTS",
+        "IF_OUT_ERRORS",
+        "IF_OUT_DISCARDS",
+        "ETHER_TX_OVERSIZE_PKTS",
+        "IF_IN_OCTETS",
+        "IF_OUT_OCTETS",
+    ]:
+        counters["SAI_PORT_STAT_{}".format(field)] = str(others.get(field.lower(), 0))
+
+    return counters
+
+
+COUNTERS_DATABASES = dict(
+    INTF_DATABASES,
+    COUNTERS_DB={
+        "COUNTERS_PORT_NAME_MAP": {
+            "Ethernet0": "oid:0x1000000000001",
+            "Ethernet4": "oid:0x1000000000002",
+            "Ethernet8": "oid:0x1000000000003",
+        },
+        "COUNTERS:oid:0x1000000000001": _sai_counters(
+            1234567, 1000, if_out_ucast_pkts=10, if_out_non_ucast_pkts=5, if_in_octets=987654321
+        ),
+        "RATES:oid:0x1000000000001": {"RX_BPS": "125000000.0", "TX_BPS": "20000.0"},
+        # a counter not supported by the ASIC, and no RATES table (201911)
+        "COUNTERS:oid:0x1000000000002": dict(
+            _sai_counters(5, 0), SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS=None
+        ),
+        "COUNTERS:oid:0x1000000000003": _sai_counters(0, 0),
+        "RATES:oid:0x1000000000003": {"RX_BPS": "0.0", "TX_BPS": "0.0"},
+    },
+)
+
+
+def test_script_counters(mocker):
+    """Test criteo_intf_information -c sums the SAI counters and formats them like portstat."""
+    script, _ = _load_intf_information(mocker, COUNTERS_DATABASES, [])
+
+    counters = script.PortCounters().get_counters()
+
+    assert list(counters) == ["Ethernet0", "Ethernet4", "Ethernet8"]
+    assert counters["Ethernet0"] == {
+        "STATE": "U",
+        "RX_OK": "1,235,567",
+        "RX_BPS": "125.00 MB/s",
+        "RX_UTIL": "1.00%",
+        "RX_ERR": "0",
+        "RX_DRP": "0",
+        "RX_OVR": "0",
+        "TX_OK": "15",
+        "TX_BPS": "20.00 KB/s",
+        "TX_UTIL": "0.00%",
+        "TX_ERR": "0",
+        "TX_DRP": "0",
+        "TX_OVR": "0",
+        "RX_OCTETS": "987,654,321",
+        "TX_OCTETS": "0",
+    }
+    # a missing counter or rate is N/A
+    assert counters["Ethernet4"]["STATE"] == "D"
+    assert counters["Ethernet4"]["RX_OK"] == "N/A"
+    assert counters["Ethernet4"]["TX_OK"] == "0"
+    assert [counters["Ethernet4"][field] for field in ["RX_BPS", "RX_UTIL", "TX_BPS"]] == [
+        "N/A",
+        "N/A",
+        "N/A",
+    ]
+    # admin down, without speed
+    assert counters["Ethernet8"]["STATE"] == "X"
+    assert counters["Ethernet8"]["RX_BPS"] == "0.00 B/s"
+    assert counters["Ethernet8"]["RX_UTIL"] == "N/A"
+
+
+def test_script_counters__interfaces(mocker):
+    """Test criteo_intf_information -c reads only the requested ports."""
+    script, connector = _load_intf_information(mocker, COUNTERS_DATABASES, [])
+    port_counters = script.PortCounters()
+
+    assert list(port_counters.get_counters(["Ethernet4", "Ethernet12"])) == ["Ethernet4"]
+    assert [command[:3] for command in connector.commands] == [
+        ("COUNTERS_DB", "HGETALL", "COUNTERS_PORT_NAME_MAP"),
+        ("COUNTERS_DB", "HMGET", "COUNTERS:oid:0x1000000000002"),
+        ("COUNTERS_DB", "HMGET", "RATES:oid:0x1000000000002"),
+        ("APPL_DB", "HMGET", "PORT_TABLE:Ethernet4"),
+    ]
+
+    # the port name map is read again only for an unknown port
+    connector.commands.clear()
+    port_counters.get_counters(["Ethernet0"])
+    assert ("COUNTERS_DB", "HGETALL", "COUNTERS_PORT_NAME_MAP", None) not in connector.commands
+
+
+def test_script_counters__format(mocker):
+    """Test the formatting of counters, rates and port states of criteo_intf_information -c."""
+    script, _ = _load_intf_information(mocker, INTF_DATABASES, [])
+
+    assert script.format_number_with_comma(1234567) == "1,234,567"
+    assert script.format_number_with_comma(0) == "0"
+    assert script.format_number_with_comma(None) == "N/A"
+
+    assert script.format_brate("10000") == "10000.00 B/s"
+    assert script.format_brate("10001") == "10.00 KB/s"
+    assert script.format_brate("12345678") == "12.35 MB/s"
+    assert script.format_brate(None) == "N/A"
+
+    # speed in Mbps
+    assert script.format_util("1250000000", "10000") == "100.00%"
+    assert script.format_util("62500000", "100000") == "0.50%"
+    assert script.format_util(None, "10000") == "N/A"
+    assert script.format_util("1250000", None) == "N/A"
+    assert script.format_util("1250000", "N/A") == "N/A"
+    assert script.format_util("1250000", "0") == "N/A"
+
+    assert script.port_oper_state({"admin_status": "up", "oper_status": "up"}) == "U"
+    assert script.port_oper_state({"admin_status": "up", "oper_status": "down"}) == "D"
+    assert script.port_oper_state({"admin_status": "down", "oper_status": "up"}) == "X"
+    assert script.port_oper_state({}) == "N/A"
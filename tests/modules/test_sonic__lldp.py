@@ -1,6 +1,13 @@
 """Unit tests for sonic lldp functions."""
+import copy
+import json
+import os
+import time
+
+import pytest
 from tests.modules.resources import wanted_results
 
+import _modules.sonic as EXEC_MOD
 from _modules.sonic import lldp
 from _utils.naming import normalize_plural
 
@@ -11,6 +18,13 @@ def _call_normalize(command, *args, **kwargs):  # pylint: disable=W0613
     return normalize_plural(*args)
 
 
+@pytest.fixture(autouse=True)
+def minion_cache(mocker, tmp_path):
+    """Use an empty minion cache, as if the sonic_lldp beacon was not running."""
+    mocker.patch.object(EXEC_MOD, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+    mocker.patch.object(EXEC_MOD, "__context__", {}, create=True)
+
+
 def test_lldp__empty_response(mocker):
     """Test LLDP when there is no answer at all (buggy response)."""
     mocker.patch("_modules.sonic._get_lldp", return_value="")
@@ -103,3 +117,55 @@ def test_lldp__interfaces_napalm_output__unconfigured_server(mocker):
     mocker.patch("_modules.sonic._get_lldp", return_value=fake_lldp)
 
     assert lldp("Ethernet96", napalm_output=True) == wanted_results.napalm_unconfigured_server
+
+
+def test_lldp__several_interfaces(mocker):
+    """Test LLDP for several interfaces with a single lldpctl call."""
+    with open(f"{RES_DIR}/lldp_interfaces.json") as resource:
+        fake_lldp = resource.read()
+    mock = mocker.patch("_modules.sonic._get_lldp", return_value=fake_lldp)
+
+    lldp("Ethernet0", interfaces="Ethernet4,Ethernet8")
+    mock.assert_called_once_with(["Ethernet0", "Ethernet4", "Ethernet8"])
+
+
+def test__convert_lldp_napalm_fmt__input_reusable(mocker):
+    """Test the napalm conversion does not consume the lldp info."""
+    with open(f"{RES_DIR}/lldp_server_configured.json") as resource:
+        lldp_info = json.load(resource)["lldp"]["interface"]
+    mocker.patch("_modules.sonic._utils_call", side_effect=_call_normalize)
+
+    wanted = copy.deepcopy(lldp_info)
+    first = EXEC_MOD._convert_lldp_napalm_fmt(lldp_info)
+    assert lldp_info == wanted
+    assert EXEC_MOD._convert_lldp_napalm_fmt(lldp_info) == first
+
+
+def _write_lldp_cache(tmp_path, entries):
+    with open(tmp_path / EXEC_MOD.LLDP_CACHE_FILENAME, "w", encoding="utf-8") as fd:
+        json.dump({"interface": entries}, fd)
+
+
+def test_lldp__warm_cache(mocker, tmp_path):
+    """Test LLDP is served from the beacon cache without running lldpctl."""
+    with open(f"{RES_DIR}/lldp_interfaces.json") as resource:
+        entries = json.load(resource)["lldp"]["interface"]
+    _write_lldp_cache(tmp_path, entries)
+    get_lldp = mocker.patch("_modules.sonic._get_lldp")
+
+    assert lldp() == wanted_results.native_interfaces
+    assert lldp(next(iter(entries[1]))) == entries[1]
+    assert lldp("Unknown") is None
+    get_lldp.assert_not_called()
+
+
+def test_lldp__stale_cache(mocker, tmp_path):
+    """Test lldpctl is run when the beacon does not update the cache anymore."""
+    _write_lldp_cache(tmp_path, [])
+    cache_file = tmp_path / EXEC_MOD.LLDP_CACHE_FILENAME
+    stale = time.time() - EXEC_MOD.LLDP_CACHE_MAX_AGE - 1
+    os.utime(cache_file, (stale, stale))
+    get_lldp = mocker.patch("_modules.sonic._get_lldp", return_value='{"lldp": {}}')
+
+    assert lldp("Ethernet0") is None
+    get_lldp.assert_called_once_with(["Ethernet0"])
@@ -0,0 +1,253 @@
+"""Unit tests for sonic MAC table functions."""
+import pytest
+
+from salt import exceptions
+
+import _modules.sonic as EXEC_MOD
+from _modules.sonic import get_mac_from_port, get_port_from_mac, get_ports_from_macs
+
+
+def _fdb_entries(*_, **__):
+    return iter(
+        [
+            {
+                "No.": 1,
+                "Vlan": 1001,
+                "MacAddress": "00:53:00:01:02:03",
+                "Port": "Ethernet0",
+                "Type": "Dynamic",
+            },
+            {
+                "No.": 2,
+                "Vlan": 1000,
+                "MacAddress": "00:53:00:01:02:04",
+                "Port": "Ethernet4",
+                "Type": "Static",
+            },
+        ]
+    )
+
+
+def test__run_ndjson():
+    """Test objects are read line by line."""
+    assert list(EXEC_MOD._run_ndjson("printf '{\"a\": 1}\\n\\n[2]\\n'")) == [{"a": 1}, [2]]
+
+
+def test__run_ndjson__error():
+    """Test errors reported by the scripts."""
+    with pytest.raises(exceptions.CommandExecutionError, match="Invalid port"):
+        list(EXEC_MOD._run_ndjson("echo '{\"error\": \"Invalid port Ethernet1\"}'"))
+
+
+def test__run_ndjson__invalid_output():
+    """Test output which is not JSON."""
+    with pytest.raises(exceptions.CommandExecutionError, match="Invalid output"):
+        list(EXEC_MOD._run_ndjson("printf '{\"a\": 1}\\nTraceback\\n'"))
+
+
+def test__run_ndjson__failure():
+    """Test command failure."""
+    with pytest.raises(exceptions.CommandExecutionError):
+        list(EXEC_MOD._run_ndjson("false"))
+
+
+def test_get_mac_from_port__sorted(mocker):
+    """Test the streamed MAC table is sorted per VLAN like the JSON output."""
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_mac_from_port() == [
+        {
+            "No.": 1,
+            "Vlan": 1000,
+            "MacAddress": "00:53:00:01:02:04",
+            "Port": "Ethernet4",
+            "Type": "Static",
+        },
+        {
+            "No.": 2,
+            "Vlan": 1001,
+            "MacAddress": "00:53:00:01:02:03",
+            "Port": "Ethernet0",
+            "Type": "Dynamic",
+        },
+    ]
+
+
+def test_get_mac_from_port__napalm_output(mocker):
+    """Test get_mac_from_port with a napalm output."""
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_mac_from_port("Ethernet4", napalm_output=True)[0] == {
+        "mac": "00:53:00:01:02:04",
+        "interface": "Ethernet4",
+        "vlan": 1000,
+        "static": True,
+        "active": "N/A",
+        "moves": "N/A",
+        "last_move": "N/A",
+    }
+
+
+def test_get_port_from_mac__found(mocker):
+    """Test get_port_from_mac when the MAC is learnt."""
+    mocker.patch("_modules.sonic._fdbshow_filters_address", return_value=False)
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_port_from_mac("00:53:00:01:02:03") == [
+        {
+            "No.": 1,
+            "Vlan": 1001,
+            "MacAddress": "00:53:00:01:02:03",
+            "Port": "Ethernet0",
+            "Type": "Dynamic",
+        }
+    ]
+
+
+def test_get_port_from_mac__not_found(mocker):
+    """Test get_port_from_mac when the MAC is unknown."""
+    mocker.patch("_modules.sonic._fdbshow_filters_address", return_value=False)
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_port_from_mac("00:53:00:01:02:05") is None
+
+
+def test_get_port_from_mac__address_filter(mocker):
+    """Test get_port_from_mac lets criteo_fdbshow filter the MAC when supported."""
+    grains = {"grains.get": mocker.Mock(return_value="202205.123-abcdef")}
+    mocker.patch.object(EXEC_MOD, "__salt__", grains, create=True)
+    run = mocker.patch("_modules.sonic._run_ndjson", return_value=iter([]))
+
+    assert get_port_from_mac("00:53:00:01:02:0a") is None
+    run.assert_called_once_with(
+        "/usr/bin/python /opt/salt/scripts/criteo_fdbshow -n -a 00:53:00:01:02:0A"
+    )
+
+
+def test_get_port_from_mac__invalid(mocker):
+    """Test get_port_from_mac does not read the MAC table for an invalid MAC."""
+    entries = mocker.patch("_modules.sonic._get_fdb_entries")
+
+    assert get_port_from_mac("foo") is None
+    entries.assert_not_called()
+
+
+def test_get_ports_from_macs(mocker):
+    """Test get_ports_from_macs reads the MAC table once for all the MACs."""
+    entries = mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_ports_from_macs("00:53:00:01:02:03,00:53:00:01:02:04,00:53:00:01:02:05") == {
+        "00:53:00:01:02:03": [
+            {
+                "No.": 1,
+                "Vlan": 1001,
+                "MacAddress": "00:53:00:01:02:03",
+                "Port": "Ethernet0",
+                "Type": "Dynamic",
+            }
+        ],
+        "00:53:00:01:02:04": [
+            {
+                "No.": 1,
+                "Vlan": 1000,
+                "MacAddress": "00:53:00:01:02:04",
+                "Port": "Ethernet4",
+                "Type": "Static",
+            }
+        ],
+    }
+    entries.assert_called_once_with()
+
+
+def test_get_ports_from_macs__napalm_output(mocker):
+    """Test get_ports_from_macs with a napalm output."""
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    assert get_ports_from_macs(["00:53:00:01:02:04"], napalm_output=True) == {
+        "00:53:00:01:02:04": [
+            {
+                "mac": "00:53:00:01:02:04",
+                "interface": "Ethernet4",
+                "vlan": 1000,
+                "static": True,
+                "active": "N/A",
+                "moves": "N/A",
+                "last_move": "N/A",
+            }
+        ]
+    }
+
+
+def test__pack_fdb_key():
+    """Test Vlan and MAC are packed in a single integer and back."""
+    key = EXEC_MOD._pack_fdb_key(1000, "00:53:00:01:02:0A")
+    assert key == 1000 << 48 | 0x00530001020A
+    assert EXEC_MOD._unpack_fdb_key(key) == (1000, "00:53:00:01:02:0A")
+
+
+def test_get_mac_table_changes(mocker, tmp_path):
+    """Test MAC entries learned, aged out and moved between two calls."""
+    mocker.patch.object(EXEC_MOD, "__opts__", {"cachedir": str(tmp_path)}, create=True)
+    mocker.patch("_modules.sonic.time.time", return_value=1700000000.0)
+    mocker.patch("_modules.sonic._get_fdb_entries", side_effect=_fdb_entries)
+
+    first = EXEC_MOD.get_mac_table_changes()
+    assert [entry["MacAddress"] for entry in first["learned"]] == [
+        "00:53:00:01:02:04",
+        "00:53:00:01:02:03",
+    ]
+    assert not first["aged"] and not first["moved"]
+
+    moved = {
+        "No.": 1,
+        "Vlan": 1001,
+        "MacAddress": "00:53:00:01:02:03",
+        "Port": "Ethernet8",
+        "Type": "Dynamic",
+    }
+    mocker.patch("_modules.sonic._get_fdb_entries", return_value=iter([moved]))
+
+    assert EXEC_MOD.get_mac_table_changes(napalm_output=True) == {
+        "learned": [],
+        "aged": [
+            {
+                "mac": "00:53:00:01:02:04",
+                "interface": "Ethernet4",
+                "vlan": 1000,
+                "static": True,
+                "active": False,
+                "moves": 0,
+                "last_move": None,
+            }
+        ],
+        "moved": [
+            {
+                "mac": "00:53:00:01:02:03",
+                "interface": "Ethernet8",
+                "vlan": 1001,
+                "static": False,
+                "active": True,
+                "moves": 1,
+                "last_move": 1700000000.0,
+            }
+        ],
+    }
+    assert EXEC_MOD._load_fdb_snapshot() == {
+        EXEC_MOD._pack_fdb_key(1001, "00:53:00:01:02:03"): ["Ethernet8", 0, 1, 1700000000.0]
+    }
+
+
+def test_get_mac_counts(mocker):
+    """Test get_mac_counts lets criteo_fdbshow count the entries."""
+    counts = {"Total": 3, "Vlan": {"1000": 3}, "Port": {"Ethernet0": 3}, "Type": {"Static": 3}}
+    run = mocker.patch("_modules.sonic._run_ndjson", return_value=iter([counts]))
+
+    assert EXEC_MOD.get_mac_counts(interface="Ethernet0") == {
+        "Total": 3,
+        "Vlan": {1000: 3},
+        "Port": {"Ethernet0": 3},
+        "Type": {"Static": 3},
+    }
+    run.assert_called_once_with(
+        "/usr/bin/python /opt/salt/scripts/criteo_fdbshow -n -c -p Ethernet0"
+    )
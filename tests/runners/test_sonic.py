@@ -0,0 +1,60 @@
+"""Unit tests for sonic runner functions."""
+
+import _runners.sonic as RUNNER
+
+MAC = "00:53:00:01:02:03"
+
+
+def _entry(port, vlan=1000):
+    return {"No.": 1, "Vlan": vlan, "MacAddress": MAC, "Port": port, "Type": "Dynamic"}
+
+
+def _mock_client(mocker, returns):
+    client = mocker.Mock()
+    consumed = []
+
+    def cmd_batch(*_, **__):
+        for ret in returns:
+            consumed.append(ret)
+            yield ret
+
+    client.cmd_batch.side_effect = cmd_batch
+    mocker.patch("_runners.sonic._get_client", return_value=client)
+    return client, consumed
+
+
+def test_locate_mac__edge(mocker):
+    """Test the MAC is located on an edge port, without querying other batches."""
+    client, consumed = _mock_client(
+        mocker,
+        [
+            {"sonic.tor1": None},
+            {"sonic.tor2": [_entry("PortChannel1")]},
+            {"sonic.tor3": [_entry("Ethernet8")]},
+            {"sonic.tor4": [_entry("Ethernet0")]},
+        ],
+    )
+
+    assert RUNNER.locate_mac(MAC, batch_size=2) == {
+        "edge": {"minion": "sonic.tor3", "port": "Ethernet8", "vlan": 1000},
+        "uplinks": {"sonic.tor2": ["PortChannel1"]},
+        "queried": 3,
+    }
+    assert len(consumed) == 3
+    assert client.cmd_batch.call_args[1]["batch"] == "2"
+
+
+def test_locate_mac__not_found(mocker):
+    """Test the MAC is not found, including switches in error or timeout."""
+    _mock_client(mocker, [{"sonic.tor1": "ERROR"}, {"sonic.tor2": {}}])
+
+    assert RUNNER.locate_mac(MAC) == {"edge": None, "uplinks": {}, "queried": 2}
+
+
+def test_locate_mac__uplink_ports(mocker):
+    """Test custom uplink ports."""
+    _mock_client(mocker, [{"sonic.tor1": [_entry("Ethernet120")]}])
+
+    assert RUNNER.locate_mac(MAC, uplink_ports="^Ethernet12[0-9]$")["uplinks"] == {
+        "sonic.tor1": ["Ethernet120"]
+    }
@@ -0,0 +1,73 @@
+"""Unit tests for sonic state functions."""
+
+import pytest
+
+from salt import exceptions
+
+import _states.sonic as STATE_MOD
+
+
+def _bgp_ret(result=True, changes="diff"):
+    return {"result": result, "dry_run": False, "changes": changes, "comment": "- comment"}
+
+
+def _mock_salt(mocker, bgp_config, configdb_config=None):
+    salt_mock = {
+        "sonic.bgp_config": mocker.MagicMock(side_effect=bgp_config),
+        "sonic.configdb_config": mocker.MagicMock(side_effect=configdb_config),
+        "sonic.save_bgp_config": mocker.MagicMock(return_value=True),
+    }
+    mocker.patch.object(STATE_MOD, "__salt__", salt_mock, create=True)
+    mocker.patch.object(STATE_MOD, "__opts__", {"test": False}, create=True)
+
+    return salt_mock
+
+
+def test_managed__bgp_single_save(mocker):
+    """Test managed saves the BGP config once after several templates."""
+    salt_mock = _mock_salt(mocker, [_bgp_ret(), _bgp_ret(changes=None), _bgp_ret()])
+
+    ret = STATE_MOD.managed("sonic", {"bgp": ["salt://a.j2", "salt://b.j2", "salt://c.j2"]})
+
+    assert ret["result"] is True
+    assert ret["changes"] == {
+        "bgp": {"salt://a.j2": "diff", "salt://b.j2": None, "salt://c.j2": "diff"}
+    }
+    assert all(
+        call.kwargs["save"] is False for call in salt_mock["sonic.bgp_config"].call_args_list
+    )
+    salt_mock["sonic.save_bgp_config"].assert_called_once_with()
+
+
+def test_managed__bgp_no_changes(mocker):
+    """Test managed does not save the BGP config if nothing was pushed."""
+    salt_mock = _mock_salt(mocker, [_bgp_ret(changes=None)])
+
+    ret = STATE_MOD.managed("sonic", {"bgp": "salt://a.j2"})
+
+    assert ret["result"] is True
+    assert ret["changes"] == {"bgp": None}
+    salt_mock["sonic.save_bgp_config"].assert_not_called()
+
+
+def test_managed__bgp_failure(mocker):
+    """Test managed stops at the first failed BGP template and saves the previous ones."""
+    salt_mock = _mock_salt(mocker, [_bgp_ret(), _bgp_ret(result=False), _bgp_ret()])
+
+    ret = STATE_MOD.managed("sonic", {"bgp": ["salt://a.j2", "salt://b.j2", "salt://c.j2"]})
+
+    assert ret["result"] is False
+    assert salt_mock["sonic.bgp_config"].call_count == 2
+    salt_mock["sonic.save_bgp_config"].assert_called_once_with()
+
+
+def test_managed__bgp_saved_on_error(mocker):
+    """Test managed saves the BGP config when a later section raises."""
+    salt_mock = _mock_salt(
+        mocker, [_bgp_ret()], configdb_config=exceptions.CommandExecutionError("invalid")
+    )
+
+    with pytest.raises(exceptions.CommandExecutionError):
+        STATE_MOD.managed("sonic", {"bgp": "salt://a.j2", "config_db": "salt://db.j2"})
+
+    salt_mock["sonic.save_bgp_config"].assert_called_once_with()
@@ -42,3 +42,353 @@ def test_list_changed_objects__no_changes():
         "ipv4_prefix_lists": ["PF-DEFAULT"],
         "community_lists": ["CL-CLOS_SERVER"],
     }
+
+
+def test_get_objects():
+    """Test get_objects keeps the statements of supported objects only."""
+    config = "\n".join(
+        [
+            "router bgp 65000",
+            " neighbor PEERS peer-group",
+            "!",
+            "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0",
+            "ip prefix-list PF-DEFAULT seq 10 deny any",
+            "!",
+            "route-map RM-IN permit 10",
+            " match ip address prefix-list PF-DEFAULT",
+            " set local-preference 200",
+            "!",
+            "route-map RM-IN deny 20",
+            "!",
+        ]
+    )
+
+    objects = UTIL_MOD.get_objects(config)
+
+    assert objects == {
+        "route_maps": {
+            "RM-IN": {
+                "route-map RM-IN permit 10": {
+                    "match ip address prefix-list PF-DEFAULT",
+                    "set local-preference 200",
+                },
+                "route-map RM-IN deny 20": set(),
+            }
+        },
+        "ipv4_prefix_lists": {
+            "PF-DEFAULT": {
+                "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0": set(),
+                "ip prefix-list PF-DEFAULT seq 10 deny any": set(),
+            }
+        },
+        "ipv6_prefix_lists": {},
+        "community_lists": {},
+    }
+
+
+def test_get_objects__cached(mocker):
+    """Test a same config is parsed once."""
+    mocker.patch.object(UTIL_MOD, "_PARSED_CONFIGS", UTIL_MOD.OrderedDict())
+    parse = mocker.spy(UTIL_MOD, "_parse_config")
+    reference_config = _get_config("reference_config.txt")
+
+    UTIL_MOD.list_changed_objects(reference_config, _get_config("candidate_no_changes.txt"))
+    UTIL_MOD.list_changed_objects(reference_config, _get_config("candidate_changes.txt"))
+
+    assert parse.call_count == 3
+
+
+def test_get_delta_config():
+    """Test get_delta_config replaces changed objects only."""
+    reference_config = _get_config("reference_config.txt")
+    candidate_config = _get_config("candidate_changes.txt")
+
+    delta = UTIL_MOD.get_delta_config(reference_config, candidate_config)
+
+    assert delta == "\n".join(
+        [
+            "ip prefix-list PF-DEFAULT seq 20 permit 0.0.0.0/32",
+            "!",
+            "bgp community-list expanded CL-CLOS_SERVER permit 64985:8888",
+            "no bgp community-list expanded CL-CLOS_SERVER permit 64985:40200",
+            "!",
+            "no route-map RM-CLOS-IN permit 50",
+            "!\n",
+        ]
+    )
+
+
+def test_get_delta_config__statements():
+    """Test get_delta_config on route-map statements and other lines."""
+    reference_config = "\n".join(
+        [
+            "route-map RM-IN permit 10",
+            " match community CL-LOCAL",
+            " set local-preference 100",
+            "!",
+            "router bgp 65000",
+            " neighbor PEERS peer-group",
+        ]
+    )
+    candidate_config = "\n".join(
+        [
+            "route-map RM-IN permit 10",
+            " match community CL-LOCAL",
+            " set local-preference 200",
+            "!",
+            "route-map RM-IN permit 20",
+            " set weight 10",
+            "!",
+            "router bgp 65000",
+            " neighbor PEERS route-map RM-IN in",
+            "!",
+        ]
+    )
+
+    delta = UTIL_MOD.get_delta_config(reference_config, candidate_config)
+
+    assert delta == "\n".join(
+        [
+            "route-map RM-IN permit 10",
+            " no set local-preference 100",
+            " set local-preference 200",
+            "route-map RM-IN permit 20",
+            " set weight 10",
+            "!",
+            "router bgp 65000",
+            " neighbor PEERS route-map RM-IN in\n",
+        ]
+    )
+
+
+def test_get_delta_config__no_changes():
+    """Test get_delta_config when no object changed."""
+    reference_config = "\n".join(
+        [
+            "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0",
+            "!",
+            "route-map RM-IN permit 10",
+            " set local-preference 100",
+        ]
+    )
+    candidate_config = "route-map RM-IN permit 10\n set local-preference 100\n!\n"
+
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == ""
+
+
+def test_list_changed_fingerprints():
+    """Test list_changed_fingerprints finds the same changes as list_changed_objects."""
+    reference_config = _get_config("reference_config.txt")
+    candidate_config = _get_config("candidate_changes.txt")
+    fingerprints = UTIL_MOD.get_fingerprints(reference_config)
+
+    changes = UTIL_MOD.list_changed_fingerprints(fingerprints, candidate_config)
+
+    assert changes == UTIL_MOD.list_changed_objects(reference_config, candidate_config)
+    assert not UTIL_MOD.list_changed_fingerprints(fingerprints, reference_config)
+
+
+def test_list_changed_objects__lines():
+    """Test list_changed_objects compares other lines with their blocks."""
+    reference_config = _get_config("reference_config.txt")
+    candidate_config = "\n".join(
+        [
+            "router bgp 65001",
+            "  neighbor PG-L3_SP remote-as 65501",
+            "  address-family ipv4 unicast",
+            "    network 10.180.1.0/25",
+            "    network 10.180.2.0/25",
+            "  exit-address-family",
+            "  address-family ipv6 unicast",
+            "    network fd09:0:100::/64",
+            "    network 10.180.1.128/25",
+            "  exit-address-family",
+            "!",
+        ]
+    )
+
+    changes = UTIL_MOD.list_changed_objects(reference_config, candidate_config)
+
+    assert changes == {
+        "lines": [
+            "router bgp 65001 > address-family ipv4 unicast > network 10.180.2.0/25",
+            "router bgp 65001 > address-family ipv6 unicast > network 10.180.1.128/25",
+        ]
+    }
+    fingerprints = UTIL_MOD.get_fingerprints(reference_config)
+    assert UTIL_MOD.list_changed_fingerprints(fingerprints, candidate_config) == changes
+
+
+def test_get_delta_config__lines_unchanged():
+    """Test get_delta_config skips other lines if they are all in reference config."""
+    reference_config = _get_config("reference_config.txt")
+    candidate_config = "\n".join(
+        [
+            "ip prefix-list PF-NEW seq 5 permit 10.0.0.0/8",
+            "!",
+            "router bgp 65001",
+            " address-family ipv4 unicast",
+            "  network 10.252.168.5/32",
+            " exit-address-family",
+            "exit",
+        ]
+    )
+
+    delta = UTIL_MOD.get_delta_config(reference_config, candidate_config)
+
+    assert delta == "ip prefix-list PF-NEW seq 5 permit 10.0.0.0/8\n!\n"
+
+
+def test_get_inventory():
+    """Test get_inventory counts the entries, and fingerprints them regardless of their order."""
+    config = "\n".join(
+        [
+            "ip prefix-list PF-DEFAULT seq 5 permit 0.0.0.0/0",
+            "bgp community-list standard CL-SERVER seq 5 permit 65000:1",
+            "bgp community-list standard CL-SERVER seq 10 permit 65000:2",
+            "route-map RM-IN permit 10",
+            " match ip address prefix-list PF-DEFAULT",
+            " set local-preference 200",
+            "route-map RM-IN deny 20",
+            "route-map RM-OUT permit 10",
+            " set local-preference 200",
+            " match ip address prefix-list PF-DEFAULT",
+            "route-map RM-OUT deny 20",
+            "!",
+        ]
+    )
+
+    inventory = UTIL_MOD.get_inventory(config)
+
+    assert {
+        object_type: {name: info["entries"] for name, info in objects.items()}
+        for object_type, objects in inventory.items()
+    } == {
+        "route_maps": {"RM-IN": 2, "RM-OUT": 2},
+        "ipv4_prefix_lists": {"PF-DEFAULT": 1},
+        "ipv6_prefix_lists": {},
+        "community_lists": {"CL-SERVER": 2},
+    }
+    assert (
+        inventory["route_maps"]["RM-IN"]["fingerprint"]
+        == UTIL_MOD.get_fingerprints(config)["route_maps"]["RM-IN"]
+    )
+
+    # statements are not ordered
+    reordered_config = "\n".join(
+        [
+            "route-map RM-IN permit 10",
+            " set local-preference 200",
+            " match ip address prefix-list PF-DEFAULT",
+            "route-map RM-IN deny 20",
+        ]
+    )
+    assert UTIL_MOD.get_inventory(reordered_config)["route_maps"] == {
+        "RM-IN": inventory["route_maps"]["RM-IN"]
+    }
+
+
+def test_get_delta_config__blank_lines():
+    """Test blank lines left by Jinja tags are not changes."""
+    reference_config = _get_config("reference_config.txt")
+    candidate_config = reference_config.replace("router bgp 65001\n", "router bgp 65001\n\n")
+    assert candidate_config != reference_config
+
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == ""
+    assert not UTIL_MOD.list_changed_fingerprints(
+        UTIL_MOD.get_fingerprints(reference_config), candidate_config
+    )
+
+    reference_config = "route-map RM permit 10\n match community CL\n set local-preference 200\n"
+    candidate_config = "\n".join(
+        [
+            "route-map RM permit 10",
+            " match community CL",
+            "",
+            " set local-preference 200",
+            "  ",
+            "",
+        ]
+    )
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == ""
+
+
+def test_get_delta_config__route_map_action():
+    """Test a route-map entry changing its action, with the same statements, is a change."""
+    reference_config = "route-map RM permit 10\n match ip address prefix-list A\n"
+    candidate_config = "route-map RM deny 10\n match ip address prefix-list A\n"
+
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == "\n".join(
+        [
+            "no route-map RM permit 10",
+            "route-map RM deny 10",
+            " match ip address prefix-list A",
+            "!\n",
+        ]
+    )
+    fingerprints = UTIL_MOD.get_fingerprints(reference_config)
+    assert UTIL_MOD.list_changed_fingerprints(fingerprints, candidate_config) == {
+        "route_maps": ["RM"]
+    }
+
+
+def test_get_delta_config__route_map_sequence():
+    """Test a renumbered route-map entry, with the same statements, is a change."""
+    reference_config = "route-map RM permit 10\n match ip address prefix-list A\n"
+    candidate_config = "route-map RM permit 20\n match ip address prefix-list A\n"
+
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == "\n".join(
+        [
+            "route-map RM permit 20",
+            " match ip address prefix-list A",
+            "no route-map RM permit 10",
+            "!\n",
+        ]
+    )
+    fingerprints = UTIL_MOD.get_fingerprints(reference_config)
+    assert UTIL_MOD.list_changed_fingerprints(fingerprints, candidate_config) == {
+        "route_maps": ["RM"]
+    }
+
+
+def test_get_delta_config__prefix_list_sequence():
+    """Test prefix-list entries without sequence number are numbered like FRR does."""
+    # running config, as FRR shows it
+    reference_config = "\n".join(
+        [
+            "ip prefix-list PF seq 5 permit 10.0.0.0/8",
+            "ip prefix-list PF seq 10 permit 172.16.0.0/12",
+            "ip prefix-list PF seq 12 permit 192.168.0.0/16",
+            "ip prefix-list PF seq 15 deny any",
+        ]
+    )
+    candidate_config = "\n".join(
+        [
+            "ip prefix-list PF permit 10.0.0.0/8",
+            "ip prefix-list PF permit 172.16.0.0/12",
+            "ip prefix-list PF seq 12 permit 192.168.0.0/16",
+            "ip prefix-list PF deny any",
+        ]
+    )
+
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == ""
+    assert not UTIL_MOD.list_changed_fingerprints(
+        UTIL_MOD.get_fingerprints(reference_config), candidate_config
+    )
+
+    # new entries are added before the entries which are gone are removed
+    candidate_config = "\n".join(
+        [
+            "ip prefix-list PF permit 10.0.0.0/8",
+            "ip prefix-list PF permit 172.16.0.0/12 le 24",
+            "ip prefix-list PF permit 100.64.0.0/10",
+        ]
+    )
+    assert UTIL_MOD.get_delta_config(reference_config, candidate_config) == "\n".join(
+        [
+            "ip prefix-list PF seq 10 permit 172.16.0.0/12 le 24",
+            "ip prefix-list PF seq 15 permit 100.64.0.0/10",
+            "no ip prefix-list PF seq 12 permit 192.168.0.0/16",
+            "!\n",
+        ]
+    )